@@ -0,0 +1,99 @@
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework import generics, mixins
+from rest_framework.response import Response
+
+from airport import serializers, views
+from airport.pagination import AsyncLimitOffsetPagination
+
+
+class AsyncGenericAPIView(generics.GenericAPIView):
+    """
+    GenericAPIView whose handlers are coroutines, served without a thread
+    per request under ASGI. Authentication, permissions and throttling
+    are the usual DRF classes, run in a thread by sync_to_async, and so
+    is anything else that may touch the database synchronously.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if not isinstance(response, Response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        obj = await aget_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[self.lookup_field]}
+        )
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class AsyncFlightView(AsyncGenericAPIView):
+    queryset = views.FlightViewSet.queryset
+    throttle_scope = "browse"
+
+
+# ListModelMixin only tells the schema generator that get() lists flights
+class FlightListView(mixins.ListModelMixin, AsyncFlightView):
+    """The flight list, same as /flights/ with limit/offset pagination"""
+
+    serializer_class = serializers.FlightListSerializer
+    values_serializer_class = serializers.FlightListValuesSerializer
+    pagination_class = AsyncLimitOffsetPagination
+    filter_backends = views.FlightViewSet.filter_backends
+    filterset_class = views.FlightViewSet.filterset_class
+    search_route_field = views.FlightViewSet.search_route_field
+    ordering_fields = views.FlightViewSet.ordering_fields
+
+    async def get(self, request):
+        serializer_class = self.values_serializer_class
+        # filters may look routes up in the database while validating
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        queryset = serializer_class.values(queryset)
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is None:
+            page = [row async for row in queryset.aiterator()]
+        data = await sync_to_async(lambda: serializer_class(page, many=True).data)()
+        if self.paginator.limit is None:
+            return Response(data)
+        return self.paginator.get_paginated_response(data)
+
+
+class FlightDetailView(AsyncFlightView):
+    """The flight detail, same as /flights/{id}/"""
+
+    serializer_class = serializers.FlightDetailSerializer
+
+    async def get(self, request, pk):
+        flight = await self.aget_object()
+        return Response(await sync_to_async(lambda: self.get_serializer(flight).data)())
+
+
+class FlightAvailabilityView(AsyncFlightView):
+    """Seat availability of a flight, same as /flights/{id}/availability/"""
+
+    queryset = views.FlightViewSet.queryset.prefetch_related(None)
+    serializer_class = serializers.FlightAvailabilitySerializer
+
+    async def get(self, request, pk):
+        flight = await self.aget_object()
+        return Response(await sync_to_async(lambda: self.get_serializer(flight).data)())
@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from airport import models
+
+
+BATCH_SIZE = 500
+MAX_CALENDAR_DAYS = 92
+FIELDS = ("flights", "capacity", "seats_available", "min_seats_available")
+
+
+def flight_day(departure_time: datetime) -> date:
+    """The day a flight counts for, in the current time zone"""
+    if timezone.is_naive(departure_time):
+        # stored as if in the current time zone
+        departure_time = timezone.make_aware(departure_time)
+    return timezone.localdate(departure_time)
+
+
+def _day_range(day: date) -> Q:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return Q(departure_time__gte=start, departure_time__lt=start + timedelta(days=1))
+
+
+def daily_rows(flights) -> list:
+    """DailyAvailability rows of the days the flights depart on, one query"""
+    capacity = F("airplane__rows") * F("airplane__seats_in_row")
+    # an airplane swapped for a smaller one can have more tickets than seats
+    available = Greatest(capacity - F("tickets_sold"), 0)
+    rows = (
+        flights.order_by()
+        .annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(
+            flights=Count("id"),
+            capacity=Sum(capacity),
+            seats_available=Sum(available),
+            min_seats_available=Min(available),
+        )
+    )
+    return [models.DailyAvailability(**row) for row in rows]
+
+
+def save_rows(rows) -> None:
+    models.DailyAvailability.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["route", "day"],
+        update_fields=FIELDS,
+    )
+
+
+def _days(keys) -> Q:
+    return reduce(or_, (Q(route_id=route, day=day) for route, day in keys))
+
+
+def refresh_days(keys) -> None:
+    """
+    Recount the (route_id, day) aggregates from their flights, dropping
+    the days that have none left.
+
+    Each batch runs in a transaction that first locks the rows of its days,
+    inserting empty ones for new days, so refreshes of the same day run one
+    after another and each counts flights committed before it got the lock.
+    Then it costs an aggregate query over the route and departure index, an
+    upsert and a delete.
+    """
+    keys = sorted(dict.fromkeys(keys))
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start : start + BATCH_SIZE]
+        with transaction.atomic():
+            models.DailyAvailability.objects.bulk_create(
+                (
+                    models.DailyAvailability(
+                        route_id=route, day=day, **dict.fromkeys(FIELDS, 0)
+                    )
+                    for route, day in batch
+                ),
+                ignore_conflicts=True,
+            )
+            list(
+                models.DailyAvailability.objects.select_for_update()
+                .filter(_days(batch))
+                .order_by("route_id", "day")
+                .values_list("pk", flat=True)
+            )
+
+            rows = daily_rows(
+                models.Flight.objects.filter(
+                    reduce(
+                        or_,
+                        (Q(route_id=route) & _day_range(day) for route, day in batch),
+                    )
+                )
+            )
+            save_rows(rows)
+            found = {(row.route_id, row.day) for row in rows}
+            empty = [key for key in batch if key not in found]
+            if empty:
+                models.DailyAvailability.objects.filter(_days(empty)).delete()
+
+
+def refresh_flights(flight_ids) -> None:
+    flights = models.Flight.objects.filter(pk__in=flight_ids)
+    refresh_days(
+        (route_id, flight_day(departure_time))
+        for route_id, departure_time in flights.values_list(
+            "route_id", "departure_time"
+        )
+    )
+
+
+def calendar(route: int, start: date, days: int):
+    """The route's days with flights from start on, one indexed query"""
+    return models.DailyAvailability.objects.filter(
+        route_id=route, day__gte=start, day__lt=start + timedelta(days=days)
+    )
+
+
+def days_changed(keys) -> None:
+    """Refresh the (route_id, day) aggregates once the transaction commits"""
+    keys = list(keys)
+    transaction.on_commit(lambda: refresh_days(keys))
+
+
+def flights_changed(flight_ids) -> None:
+    """Refresh the days of flights whose seats were sold or freed, on commit"""
+    flight_ids = list(flight_ids)
+    transaction.on_commit(lambda: refresh_flights(flight_ids))
+
+
+def rebuild() -> int:
+    """Recount every day of every route from scratch"""
+    with transaction.atomic():
+        models.DailyAvailability.objects.all().delete()
+        rows = daily_rows(models.Flight.objects.all())
+        save_rows(rows)
+    return len(rows)
@@ -0,0 +1,172 @@
+import math
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.settings import api_settings
+
+from airport import models
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    url: Callable[[int], str]
+    data: Callable[[int], dict] = None
+    expected_status: int = status.HTTP_200_OK
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list
+    queries: int
+    peak_memory: int
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "iterations": len(latencies),
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 3),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3),
+            "queries": self.queries,
+            "peak_memory_kb": round(self.peak_memory / 1024, 1),
+        }
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def free_seats(flight_ids):
+    """Yield (flight_id, row, seat) places nobody has a ticket for"""
+    flights = models.Flight.objects.select_related("airplane").filter(pk__in=flight_ids)
+    for flight in flights.order_by("pk").iterator():
+        taken = set(flight.tickets.values_list("row", "seat"))
+        for row in range(1, flight.airplane.rows + 1):
+            for seat in range(1, flight.airplane.seats_in_row + 1):
+                if (row, seat) not in taken:
+                    yield flight.id, row, seat
+
+
+def default_scenarios(ids: dict, requests: int) -> list[Scenario]:
+    """
+    Flight list and detail, order creation and order history. Every order
+    takes its own free seat, so requests is the number of orders placed.
+    """
+    flight_ids = ids["flights"]
+    seats = list(islice(free_seats(flight_ids), requests))
+    if len(seats) < requests:
+        raise BenchmarkError("Not enough free seats to create orders")
+
+    def order(iteration):
+        flight_id, row, seat = seats[iteration]
+        return {"tickets": [{"flight": flight_id, "row": row, "seat": seat}]}
+
+    return [
+        Scenario("flight list", "get", lambda i: reverse("airport:flight-list")),
+        Scenario(
+            "flight list, cursor page",
+            "get",
+            lambda i: reverse("airport:flight-list") + "?pagination=cursor",
+        ),
+        Scenario(
+            "flight detail",
+            "get",
+            lambda i: reverse(
+                "airport:flight-detail", args=[flight_ids[i % len(flight_ids)]]
+            ),
+        ),
+        Scenario(
+            "order create",
+            "post",
+            lambda i: reverse("airport:order-list"),
+            data=order,
+            expected_status=status.HTTP_201_CREATED,
+        ),
+        Scenario("order list", "get", lambda i: reverse("airport:order-list")),
+    ]
+
+
+def _request(client, scenario: Scenario, iteration: int):
+    request = getattr(client, scenario.method)
+    if scenario.data:
+        response = request(
+            scenario.url(iteration), scenario.data(iteration), format="json"
+        )
+    else:
+        response = request(scenario.url(iteration))
+    if response.status_code != scenario.expected_status:
+        raise BenchmarkError(
+            f"{scenario.name}: HTTP {response.status_code} instead of "
+            f"{scenario.expected_status}: {response.content[:200]!r}"
+        )
+    return response
+
+
+def unthrottled():
+    """
+    Override the throttle rates so long runs stay within them, while still
+    paying for the counting
+    """
+    rates = {scope: "1000000/day" for scope in api_settings.DEFAULT_THROTTLE_RATES}
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    )
+
+
+def run_scenario(client, scenario: Scenario, iterations: int, warmup: int):
+    """
+    Time iterations requests after warmup ones, then count the queries and
+    trace the memory of one more. tracemalloc slows Python down, so it is
+    kept out of the timed requests.
+    """
+    for iteration in range(warmup):
+        _request(client, scenario, iteration)
+
+    latencies = []
+    for iteration in range(warmup, warmup + iterations):
+        started = time.perf_counter()
+        _request(client, scenario, iteration)
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            _request(client, scenario, warmup + iterations)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return ScenarioResult(scenario.name, latencies, len(queries), peak_memory)
+
+
+def run_benchmarks(
+    ids: dict, iterations: int = 100, warmup: int = 5, scenarios=None
+) -> dict:
+    """Run the scenarios through the whole Django stack as a seeded user"""
+    requests = warmup + iterations + 1
+    scenarios = scenarios or default_scenarios(ids, requests)
+    user = get_user_model().objects.get(pk=ids["users"][0])
+    client = APIClient()
+    client.force_authenticate(user)
+
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ), unthrottled():
+        return {
+            scenario.name: run_scenario(client, scenario, iterations, warmup).as_dict()
+            for scenario in scenarios
+        }
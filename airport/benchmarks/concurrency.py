@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import math
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncRequestFactory, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.benchmarks.api import unthrottled
+
+
+@dataclass
+class LoadResult:
+    seconds: float
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / self.seconds, 1),
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 3),
+        }
+
+
+def endpoints(flight_ids) -> dict:
+    """{name: (WSGI path, ASGI path)} of the sync views and their async twins"""
+    flight_id = flight_ids[0]
+    return {
+        "flight list": (
+            reverse("airport:flight-list"),
+            reverse("airport:async-flight-list"),
+        ),
+        "flight detail": (
+            reverse("airport:flight-detail", args=[flight_id]),
+            reverse("airport:async-flight-detail", args=[flight_id]),
+        ),
+        "seat availability": (
+            reverse("airport:flight-availability", args=[flight_id]),
+            reverse("airport:async-flight-availability", args=[flight_id]),
+        ),
+    }
+
+
+def benchmark_tokens(clients: int) -> list[str]:
+    """One user and access token per client, each with its own throttle budget"""
+    User = get_user_model()
+    users = [
+        User.objects.filter(email=email).first() or User.objects.create_user(email)
+        for email in (f"load-{number}@benchmark.com" for number in range(clients))
+    ]
+    return [str(AccessToken.for_user(user)) for user in users]
+
+
+def run_threads(get, path: str, tokens: list, requests: int) -> LoadResult:
+    """requests GETs from one thread per token, as sync WSGI workers serve them"""
+
+    def timed(number):
+        started = time.perf_counter()
+        status = get(path, tokens[number % len(tokens)])
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(tokens)) as executor:
+        results = list(executor.map(timed, range(requests)))
+    result = LoadResult(time.perf_counter() - started)
+    for latency, status in results:
+        result.latencies.append(latency)
+        result.errors += status != 200
+    return result
+
+
+async def run_tasks(get, path: str, tokens: list, requests: int) -> LoadResult:
+    """requests GETs from one task per token on a single event loop"""
+    limit = asyncio.Semaphore(len(tokens))
+
+    async def timed(number):
+        async with limit:
+            started = time.perf_counter()
+            status = await get(path, tokens[number % len(tokens)])
+            return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(timed(number) for number in range(requests)))
+    result = LoadResult(time.perf_counter() - started)
+    for latency, status in results:
+        result.latencies.append(latency)
+        result.errors += status != 200
+    return result
+
+
+def wsgi_get(application=None):
+    application = application or WSGIHandler()
+    factory = RequestFactory()
+
+    def get(path, token):
+        statuses = []
+        environ = factory.get(path, HTTP_AUTHORIZATION=f"Bearer {token}").environ
+        response = application(environ, lambda status, headers: statuses.append(status))
+        b"".join(response)
+        response.close()
+        return int(statuses[0].split()[0])
+
+    return get
+
+
+def asgi_get(application=None):
+    application = application or get_asgi_application()
+    factory = AsyncRequestFactory()
+
+    async def get(path, token):
+        scope = factory.get(path, headers={"Authorization": f"Bearer {token}"}).scope
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # the client stays connected until the handler is done
+            await asyncio.Future()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await application(scope, receive, send)
+        return statuses[0]
+
+    return get
+
+
+def http_get(base_url: str):
+    def get(path, token):
+        request = urllib.request.Request(
+            base_url.rstrip("/") + path, headers={"Authorization": f"Bearer {token}"}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    return get
+
+
+def compare_in_process(paths: dict, tokens: list, requests: int) -> dict:
+    """
+    Serve the same load through Django's WSGI handler from a thread per
+    client and through its ASGI handler from one event loop, without a
+    network or server in between.
+    """
+    wsgi, asgi = wsgi_get(), asgi_get()
+    results = {}
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ), unthrottled():
+        for name, (wsgi_path, asgi_path) in paths.items():
+            results[name] = {
+                "wsgi": run_threads(wsgi, wsgi_path, tokens, requests).as_dict(),
+                # a fresh context, as a server's event loop thread would have
+                "asgi": contextvars.Context()
+                .run(asyncio.run, run_tasks(asgi, asgi_path, tokens, requests))
+                .as_dict(),
+            }
+    return results
+
+
+def compare_connection_reuse(
+    path: str, tokens: list, requests: int, max_ages=(0, 60)
+) -> dict:
+    """
+    Serve the same WSGI load with each CONN_MAX_AGE and count the
+    database connections opened, which is one per request with 0 and
+    one per worker thread once connections persist.
+    """
+    wsgi = wsgi_get()
+    settings_dict = connections.settings["default"]
+    old_max_age = settings_dict["CONN_MAX_AGE"]
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        opened.append(connection)
+
+    results = {}
+    connection_created.connect(count)
+    try:
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ), unthrottled():
+            for max_age in max_ages:
+                settings_dict["CONN_MAX_AGE"] = max_age
+                opened.clear()
+                result = run_threads(wsgi, path, tokens, requests).as_dict()
+                result["connections_opened"] = len(opened)
+                results[f"CONN_MAX_AGE={max_age}"] = result
+                for connection in opened:
+                    # the worker threads are gone, close what they left open
+                    connection.inc_thread_sharing()
+                    connection.close()
+    finally:
+        connection_created.disconnect(count)
+        settings_dict["CONN_MAX_AGE"] = old_max_age
+    return results
+
+
+def compare_servers(
+    paths: dict, tokens: list, requests: int, wsgi_url: str, asgi_url: str
+) -> dict:
+    """The same load over HTTP against a running WSGI and ASGI server"""
+    results = {}
+    for name, (wsgi_path, asgi_path) in paths.items():
+        results[name] = {
+            "wsgi": run_threads(
+                http_get(wsgi_url), wsgi_path, tokens, requests
+            ).as_dict(),
+            "asgi": run_threads(
+                http_get(asgi_url), asgi_path, tokens, requests
+            ).as_dict(),
+        }
+    return results
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(verbosity=0, keepdb=False):
+    """
+    Run the block against a throwaway copy of the configured database,
+    created and destroyed the same way the test runner does it.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, keepdb=keepdb
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=verbosity, keepdb=keepdb
+        )
+
+
+def analyze() -> None:
+    """Refresh planner statistics after seeding"""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
@@ -0,0 +1,130 @@
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, password_validation
+from django.contrib.auth.hashers import get_hasher
+from django.test.utils import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.benchmarks.api import BenchmarkError, unthrottled
+
+
+# user.urls shares the "airport" namespace, so its names don't reverse
+REGISTER_URL = "/api/user/register/"
+TOKEN_URL = "/api/user/token/"
+PASSWORD = "Blue-Heron-Runway-42"
+
+
+def _summary(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def _timed_posts(client, url: str, payloads: list) -> list:
+    latencies = []
+    for data in payloads:
+        started = time.perf_counter()
+        res = client.post(url, data, format="json")
+        latencies.append(time.perf_counter() - started)
+        if res.status_code not in (status.HTTP_200_OK, status.HTTP_201_CREATED):
+            raise BenchmarkError(
+                f"{url}: HTTP {res.status_code}: {res.content[:200]!r}"
+            )
+    return latencies
+
+
+def measure_hasher(name: str, users: int = 20) -> dict:
+    """
+    Register users through the API with the hasher preferred, then obtain
+    a token pair for each of them
+    """
+    emails = [f"{name}-{i}-{time.monotonic_ns()}@benchmark.com" for i in range(users)]
+    payloads = [{"email": email, "password": PASSWORD} for email in emails]
+    client = APIClient()
+
+    registrations = _timed_posts(client, REGISTER_URL, payloads)
+    logins = _timed_posts(client, TOKEN_URL, payloads)
+    get_user_model().objects.filter(email__in=emails).delete()
+    return {
+        "registrations_per_second": round(len(registrations) / sum(registrations), 1),
+        "register": _summary(registrations),
+        "token_obtain": _summary(logins),
+    }
+
+
+def measure_rehash(name: str) -> dict:
+    """Log in a user with a PBKDF2 hash and see what it is stored as after"""
+    user = get_user_model().objects.create_user(f"rehash-{name}@benchmark.com")
+    user.password = get_hasher("pbkdf2_sha256").encode(
+        PASSWORD, get_hasher("pbkdf2_sha256").salt()
+    )
+    user.save()
+
+    res = APIClient().post(
+        TOKEN_URL, {"email": user.email, "password": PASSWORD}, format="json"
+    )
+    user.refresh_from_db()
+    user.delete()
+    return {
+        "login_status": res.status_code,
+        "stored_algorithm": user.password.split("$", 1)[0],
+    }
+
+
+def measure_common_passwords(repeat: int = 5) -> dict:
+    """
+    Time loading CommonPasswordValidator's word list, which the user app
+    does at startup, against checking a password with the loaded list
+    """
+    load = min(
+        _time(password_validation.CommonPasswordValidator) for _ in range(repeat)
+    )
+    validators = password_validation.get_default_password_validators()
+    validate = min(
+        _time(password_validation.validate_password, PASSWORD, None, validators)
+        for _ in range(repeat)
+    )
+    return {
+        "word_list_load_ms": round(load * 1000, 2),
+        "validate_ms": round(validate * 1000, 3),
+    }
+
+
+def _time(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def compare_hashers(names=("pbkdf2", "scrypt", "argon2"), users: int = 20) -> dict:
+    results = {}
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ), unthrottled():
+        for name in names:
+            hashers = [
+                settings.HASHERS[name],
+                *(
+                    hasher
+                    for other, hasher in settings.HASHERS.items()
+                    if other != name
+                ),
+            ]
+            with override_settings(PASSWORD_HASHERS=hashers):
+                try:
+                    get_hasher().encode(PASSWORD, get_hasher().salt())
+                except ValueError as error:
+                    # argon2-cffi is optional
+                    results[name] = {"error": str(error)}
+                    continue
+                results[name] = {
+                    **measure_hasher(name, users),
+                    "rehash_from_pbkdf2": measure_rehash(name),
+                }
+    return {"hashers": results, "common_passwords": measure_common_passwords()}
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+
+
+# time setting Django up and loading the middleware chain and URLconf, as
+# a fresh server worker does before its first request
+STARTUP = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "modules": len(sys.modules),
+    "debug_toolbar_loaded": "debug_toolbar" in sys.modules,
+}))
+"""
+
+
+def profile_env(profile: str) -> dict:
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+        "DJANGO_PROFILE": profile,
+    }
+    if profile == "prod":
+        env.setdefault("SECRET_KEY", "benchmark-only-secret-key")
+    return env
+
+
+def _run(args: list, profile: str) -> str:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=settings.BASE_DIR,
+        env=profile_env(profile),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def measure_startup(profile: str, runs: int = 5) -> dict:
+    """Fastest of runs fresh interpreters starting up with the profile"""
+    results = [json.loads(_run(["-c", STARTUP], profile)) for _ in range(runs)]
+    return {
+        "startup_ms": round(min(result["seconds"] for result in results) * 1000, 1),
+        "modules": results[0]["modules"],
+        "debug_toolbar_loaded": results[0]["debug_toolbar_loaded"],
+    }
+
+
+def measure_requests(
+    profile: str, scale: str = "tiny", iterations: int = 50, warmup: int = 5
+) -> dict:
+    """The benchmark_api scenarios, run in a process with the profile"""
+    with tempfile.NamedTemporaryFile(suffix=".json") as output:
+        _run(
+            [
+                "manage.py",
+                "benchmark_api",
+                f"--scale={scale}",
+                f"--iterations={iterations}",
+                f"--warmup={warmup}",
+                f"--output={output.name}",
+            ],
+            profile,
+        )
+        return json.load(output)["scenarios"]
+
+
+def compare_profiles(
+    profiles=("dev", "prod"), runs: int = 5, iterations: int = 50, scale="tiny"
+) -> dict:
+    return {
+        profile: {
+            **measure_startup(profile, runs),
+            "scenarios": measure_requests(profile, scale, iterations),
+        }
+        for profile in profiles
+    }
@@ -0,0 +1,78 @@
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+
+from airport import availability, models, search
+from airport.benchmarks.seed import START
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    expected: str
+    plan: str
+
+    @property
+    def ok(self) -> bool:
+        return re.search(self.expected, self.plan) is not None
+
+
+def check_query_plans(route_id, user_id, flight_id) -> list[PlanCheck]:
+    """EXPLAIN the hot queries of the API and look for the indexes they need"""
+    departure_from = START + timedelta(days=30)
+    departure_to = departure_from + timedelta(days=7)
+    queries = [
+        (
+            "flights by route and departure range",
+            "flight_route_departure_idx",
+            models.Flight.objects.filter(
+                route_id=route_id,
+                departure_time__gte=departure_from,
+                departure_time__lte=departure_to,
+            ),
+        ),
+        (
+            "flights cursor page by departure time",
+            "flight_departure_idx",
+            models.Flight.objects.filter(departure_time__gt=departure_from)
+            .with_tickets_available()
+            .order_by("departure_time", "id")[:10],
+        ),
+        (
+            "flights by arrival range",
+            "flight_arrival_idx",
+            models.Flight.objects.filter(
+                arrival_time__gte=departure_from, arrival_time__lte=departure_to
+            ),
+        ),
+        (
+            "orders of a user, newest first",
+            "order_user_created_idx",
+            models.Order.objects.filter(user_id=user_id).order_by("-created_at", "id")[
+                :10
+            ],
+        ),
+        (
+            "airports by name or city",
+            r"airport_name_(nocase|trgm)_idx",
+            search.find_airports("Airport 00"),
+        ),
+        (
+            "taken seats of a flight",
+            r"(?i)covering index|index only scan",
+            models.Ticket.objects.filter(flight_id=flight_id).values_list(
+                "row", "seat"
+            ),
+        ),
+        (
+            "availability calendar of a route",
+            # SQLite names the index of a unique constraint itself
+            r"daily_availability_route_day|sqlite_autoindex_airport_dailyavailability",
+            availability.calendar(route_id, departure_from.date(), 31),
+        ),
+    ]
+    return [
+        PlanCheck(name=name, expected=expected, plan=queryset.explain())
+        for name, expected, queryset in queries
+    ]
@@ -0,0 +1,214 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from airport import availability, models
+
+
+@dataclass(frozen=True)
+class Scale:
+    airports: int
+    routes: int
+    airplanes: int
+    crew: int
+    flights: int
+    users: int
+    tickets: int
+
+
+SCALES = {
+    "tiny": Scale(
+        airports=5, routes=10, airplanes=3, crew=5, flights=50, users=10, tickets=200
+    ),
+    "small": Scale(
+        airports=50,
+        routes=300,
+        airplanes=20,
+        crew=100,
+        flights=10_000,
+        users=1_000,
+        tickets=50_000,
+    ),
+    "large": Scale(
+        airports=300,
+        routes=5_000,
+        airplanes=200,
+        crew=2_000,
+        flights=1_000_000,
+        users=50_000,
+        tickets=1_000_000,
+    ),
+}
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+TICKETS_PER_ORDER = 4
+
+
+def _batches(objects, size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(scale: Scale, seed: int = 0, batch_size: int = 10_000, log=None) -> dict:
+    """
+    Fill an empty database with deterministic synthetic data.
+
+    The same scale and seed always produce the same rows, so results of
+    different runs are comparable. Everything is written with bulk_create
+    and Flight.tickets_sold is filled in up front from the ticket plan.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+
+    airports = models.Airport.objects.bulk_create(
+        models.Airport(name=f"Airport {index:04}", closest_big_city=f"City {index:04}")
+        for index in range(scale.airports)
+    )
+    pairs = set()
+    while len(pairs) < scale.routes:
+        source, destination = rng.sample(airports, 2)
+        pairs.add((source.id, destination.id))
+    routes = models.Route.objects.bulk_create(
+        models.Route(
+            source_id=source_id,
+            destination_id=destination_id,
+            distance=rng.randint(200, 12_000),
+        )
+        for source_id, destination_id in sorted(pairs)
+    )
+    airplane_types = models.AirplaneType.objects.bulk_create(
+        models.AirplaneType(name=name) for name in ("Narrowbody", "Widebody")
+    )
+    airplanes = models.Airplane.objects.bulk_create(
+        models.Airplane(
+            name=f"Airplane {index:04}",
+            rows=rng.randint(20, 60),
+            seats_in_row=rng.choice((4, 6, 9, 10)),
+            airplane_type=rng.choice(airplane_types),
+        )
+        for index in range(scale.airplanes)
+    )
+    crew = models.Crew.objects.bulk_create(
+        models.Crew(first_name=f"First {index}", last_name=f"Last {index}")
+        for index in range(scale.crew)
+    )
+    log(f"Reference data: {len(airports)} airports, {len(routes)} routes")
+
+    flight_plan = []
+    for _ in range(scale.flights):
+        departure = START + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        flight_plan.append(
+            (
+                rng.choice(routes),
+                rng.choice(airplanes),
+                departure,
+                departure + timedelta(minutes=rng.randint(45, 16 * 60)),
+            )
+        )
+
+    tickets_per_flight = [0] * scale.flights
+    tickets_left = min(
+        scale.tickets, sum(airplane.capacity for _, airplane, _, _ in flight_plan)
+    )
+    while tickets_left:
+        index = rng.randrange(scale.flights)
+        capacity = flight_plan[index][1].capacity
+        count = min(rng.randint(1, TICKETS_PER_ORDER * 10), tickets_left)
+        count = min(count, capacity - tickets_per_flight[index])
+        tickets_per_flight[index] += count
+        tickets_left -= count
+
+    flight_ids = []
+    for batch in _batches(
+        (
+            models.Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=arrival,
+                tickets_sold=tickets_per_flight[index],
+            )
+            for index, (route, airplane, departure, arrival) in enumerate(flight_plan)
+        ),
+        batch_size,
+    ):
+        flight_ids.extend(
+            flight.id for flight in models.Flight.objects.bulk_create(batch)
+        )
+    log(f"Flights: {len(flight_ids)}")
+
+    through = models.Flight.crew.through
+    for batch in _batches(
+        (
+            through(flight_id=flight_id, crew_id=member.id)
+            for flight_id in flight_ids
+            for member in rng.sample(crew, min(2, len(crew)))
+        ),
+        batch_size,
+    ):
+        through.objects.bulk_create(batch)
+
+    password = make_password(None)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f"user{index}@example.com", password=password)
+        for index in range(scale.users)
+    )
+
+    def plan_orders():
+        for index, flight_id in enumerate(flight_ids):
+            seats_in_row = flight_plan[index][1].seats_in_row
+            sold = tickets_per_flight[index]
+            for first in range(0, sold, TICKETS_PER_ORDER):
+                seats = [
+                    (number // seats_in_row + 1, number % seats_in_row + 1)
+                    for number in range(first, min(first + TICKETS_PER_ORDER, sold))
+                ]
+                yield flight_id, rng.choice(users).id, seats
+
+    tickets = 0
+    for batch in _batches(plan_orders(), batch_size // TICKETS_PER_ORDER):
+        orders = models.Order.objects.bulk_create(
+            models.Order(user_id=user_id) for _, user_id, _ in batch
+        )
+        created = models.Ticket.objects.bulk_create(
+            models.Ticket(order=order, flight_id=flight_id, row=row, seat=seat)
+            for order, (flight_id, _, seats) in zip(orders, batch)
+            for row, seat in seats
+        )
+        tickets += len(created)
+    log(f"Tickets: {tickets}")
+    log(f"Daily availability: {availability.rebuild()}")
+
+    return {
+        "airports": [airport.id for airport in airports],
+        "routes": [route.id for route in routes],
+        "flights": flight_ids,
+        "users": [user.id for user in users],
+    }
+
+
+def seeded_ids() -> dict:
+    """The ids seed() returns, read back from an already seeded database"""
+    return {
+        "airports": list(
+            models.Airport.objects.order_by("id").values_list("id", flat=True)
+        ),
+        "routes": list(
+            models.Route.objects.order_by("id").values_list("id", flat=True)
+        ),
+        "flights": list(
+            models.Flight.objects.order_by("id").values_list("id", flat=True)
+        ),
+        "users": list(
+            get_user_model().objects.order_by("id").values_list("id", flat=True)
+        ),
+    }
@@ -0,0 +1,115 @@
+import json
+import time
+
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from airport import models, serializers
+from airport.renderers import FastJSONRenderer
+
+
+def _best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def compare_list_serializers(rows: int = 1000, repeat: int = 5) -> dict:
+    """
+    Time a page of rows flights and routes through the ModelSerializer
+    list serializers and their .values() counterparts, with and without
+    the query, and check that both render the same JSON.
+    """
+    cases = {
+        "flights": (
+            models.Flight.objects.select_related(
+                "airplane", "route__source", "route__destination"
+            )
+            .with_tickets_available()
+            .order_by("id"),
+            serializers.FlightListSerializer,
+            serializers.FlightListValuesSerializer,
+        ),
+        "routes": (
+            models.Route.objects.select_related("source", "destination").order_by("id"),
+            serializers.RouteListSerializer,
+            serializers.RouteListValuesSerializer,
+        ),
+    }
+
+    results = {}
+    for name, (queryset, model_serializer, values_serializer) in cases.items():
+        queryset = queryset[:rows]
+        instances = list(queryset)
+        values = list(values_serializer.values(queryset))
+        model_data = model_serializer(instances, many=True).data
+        values_data = values_serializer(values, many=True).data
+
+        model_time = _best_of(
+            repeat, lambda: model_serializer(instances, many=True).data
+        )
+        values_time = _best_of(
+            repeat, lambda: values_serializer(values, many=True).data
+        )
+        model_total = _best_of(
+            repeat, lambda: model_serializer(list(queryset), many=True).data
+        )
+        values_total = _best_of(
+            repeat,
+            lambda: values_serializer(
+                list(values_serializer.values(queryset)), many=True
+            ).data,
+        )
+        results[name] = {
+            "rows": len(instances),
+            "identical": json.dumps(model_data, cls=JSONEncoder)
+            == json.dumps(values_data, cls=JSONEncoder),
+            "model_serializer_ms": round(model_time * 1000, 3),
+            "values_serializer_ms": round(values_time * 1000, 3),
+            "serializer_speedup": round(model_time / values_time, 2),
+            "model_with_query_ms": round(model_total * 1000, 3),
+            "values_with_query_ms": round(values_total * 1000, 3),
+        }
+    return results
+
+
+def compare_renderers(rows: int = 1000, repeat: int = 5) -> dict:
+    """
+    Time DRF's JSONRenderer against FastJSONRenderer on a flight list page
+    of rows flights and on the detail of the flight with most tickets,
+    and check that both produce the same bytes.
+    """
+    flights = models.Flight.objects.with_tickets_available().order_by("id")[:rows]
+    busiest = (
+        models.Flight.objects.select_related(
+            "airplane__airplane_type", "route__source", "route__destination"
+        )
+        .prefetch_related("crew")
+        .annotate(tickets_count=Count("tickets"))
+        .order_by("-tickets_count")
+        .first()
+    )
+    payloads = {
+        "flight list": serializers.FlightListValuesSerializer(
+            list(serializers.FlightListValuesSerializer.values(flights)), many=True
+        ).data,
+        "flight detail": serializers.FlightDetailSerializer(busiest).data,
+    }
+
+    results = {}
+    for name, data in payloads.items():
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        stdlib_time = _best_of(repeat, lambda: stdlib.render(data))
+        fast_time = _best_of(repeat, lambda: fast.render(data))
+        results[name] = {
+            "bytes": len(stdlib.render(data)),
+            "identical": stdlib.render(data) == fast.render(data),
+            "json_renderer_ms": round(stdlib_time * 1000, 3),
+            "fast_renderer_ms": round(fast_time * 1000, 3),
+            "speedup": round(stdlib_time / fast_time, 2),
+        }
+    return results
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from airport import availability, holds, models, seat_map
+from airport.exceptions import SeatsUnavailable
+
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 0.05
+LOCK_POOL_SIZE = 64
+
+_flight_locks = [threading.Lock() for _ in range(LOCK_POOL_SIZE)]
+
+
+def load_airplanes(flights) -> dict:
+    """Map flight ids to airplanes, fetching the ones not cached in one query"""
+    airplanes = {}
+    missing = []
+    for flight in flights:
+        if models.Flight.airplane.is_cached(flight):
+            airplanes[flight.id] = flight.airplane
+        else:
+            missing.append(flight.id)
+    if missing:
+        for flight in models.Flight.objects.select_related("airplane").filter(
+            pk__in=missing
+        ):
+            airplanes[flight.id] = flight.airplane
+    return airplanes
+
+
+def find_taken_seats(seats) -> set:
+    """Return the (flight_id, row, seat) triples that already have tickets"""
+    seats = set(seats)
+    if not seats:
+        return set()
+    condition = reduce(
+        or_,
+        (Q(flight_id=flight_id, row=row, seat=seat) for flight_id, row, seat in seats),
+    )
+    return set(
+        models.Ticket.objects.filter(condition).values_list("flight_id", "row", "seat")
+    )
+
+
+def book_tickets(order, tickets_data) -> list:
+    """
+    Validate and insert all tickets of an order at once.
+
+    Every seat is checked against one airplane per flight (ValidationError),
+    collisions with existing tickets are found with a single query, seats
+    held by other users are rejected (SeatsUnavailable), the tickets are
+    written with one bulk insert and Flight.tickets_sold is bumped once per
+    flight. The orderer's own holds on the booked seats are released after
+    commit. Must be called inside a transaction holding the flight locks,
+    see place_order.
+    """
+    flights = {ticket["flight"].id: ticket["flight"] for ticket in tickets_data}
+    airplanes = load_airplanes(flights.values())
+
+    requested = set()
+    for ticket_data in tickets_data:
+        flight = ticket_data["flight"]
+        row, seat = ticket_data["row"], ticket_data["seat"]
+        models.Ticket.validate_ticket(row, seat, airplanes[flight.id], ValidationError)
+        if (flight.id, row, seat) in requested:
+            raise ValidationError(
+                {
+                    "tickets": f"row {row}, seat {seat} on flight {flight.id} "
+                    f"is ordered more than once"
+                }
+            )
+        requested.add((flight.id, row, seat))
+
+    taken = find_taken_seats(requested) | holds.find_held_seats(
+        requested, order.user_id
+    )
+    if taken:
+        raise SeatsUnavailable(taken)
+
+    tickets = models.Ticket.objects.bulk_create(
+        models.Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+    )
+    sold = Counter(flight_id for flight_id, _, _ in requested)
+    for flight_id, count in sold.items():
+        models.Flight.add_tickets_sold(flight_id, count)
+    availability.flights_changed(sold)
+    transaction.on_commit(lambda: _after_booking(requested, order.user_id))
+    return tickets
+
+
+def _after_booking(seats, owner) -> None:
+    seats_by_flight = defaultdict(list)
+    for flight_id, row, seat in seats:
+        seats_by_flight[flight_id].append((row, seat))
+    store = holds.get_hold_store()
+    for flight_id, flight_seats in seats_by_flight.items():
+        seat_map.update_seat_map(flight_id, flight_seats)
+        store.release(flight_id, owner, flight_seats)
+
+
+def _local_locks(flight_ids) -> ExitStack:
+    """
+    Per process flight locks for databases without SELECT ... FOR UPDATE.
+    Flights share the lock of their id modulo LOCK_POOL_SIZE, each lock is
+    taken once and in order so concurrent bookings never deadlock.
+    """
+    stack = ExitStack()
+    if connection.features.has_select_for_update:
+        return stack
+    for slot in sorted({flight_id % LOCK_POOL_SIZE for flight_id in flight_ids}):
+        stack.enter_context(_flight_locks[slot])
+    return stack
+
+
+def lock_flights(flight_ids) -> None:
+    """Lock flight rows in pk order so concurrent bookings never deadlock"""
+    if connection.features.has_select_for_update:
+        list(
+            models.Flight.objects.select_for_update()
+            .filter(pk__in=flight_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+
+def place_order(tickets_data, **order_data):
+    """
+    Create an order with its tickets while holding locks on their flights.
+
+    Transient lock failures (deadlocks, busy SQLite database) are retried
+    up to MAX_ATTEMPTS times with exponential backoff. Invalid tickets
+    raise ValidationError and seats taken by a concurrent booking raise
+    SeatsUnavailable (HTTP 409).
+    """
+    flight_ids = sorted({ticket_data["flight"].id for ticket_data in tickets_data})
+    delay = RETRY_DELAY
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with _local_locks(flight_ids), transaction.atomic():
+                lock_flights(flight_ids)
+                order = models.Order.objects.create(**order_data)
+                book_tickets(order, tickets_data)
+                return order
+        except IntegrityError:
+            taken = find_taken_seats(
+                (ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"])
+                for ticket_data in tickets_data
+            )
+            if not taken:
+                raise
+            raise SeatsUnavailable(taken)
+        except OperationalError:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def hold_seats(flight, places, owner, ttl=holds.HOLD_TTL) -> datetime:
+    """
+    Hold free (row, seat) places of a flight for owner until checkout. The
+    flight is locked like in place_order, so a seat can't be sold between
+    checking its tickets and holding it.
+    """
+    with _local_locks([flight.id]), transaction.atomic():
+        lock_flights([flight.id])
+        taken = find_taken_seats((flight.id, row, seat) for row, seat in places)
+        if taken:
+            raise SeatsUnavailable(taken)
+        expires_at, conflicts = holds.get_hold_store().hold(
+            flight.id, places, owner, ttl
+        )
+    if conflicts:
+        raise SeatsUnavailable((flight.id, row, seat) for row, seat in conflicts)
+    return datetime.fromtimestamp(expires_at, tz=timezone.utc)
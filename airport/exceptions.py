@@ -0,0 +1,20 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException, ErrorDetail
+
+
+class SeatsUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seats_unavailable"
+
+    def __init__(self, seats):
+        super().__init__()
+        self.seats = sorted(seats)
+        # keep seat numbers as integers instead of stringified error details
+        self.detail = {
+            "detail": ErrorDetail(self.default_detail, self.default_code),
+            "seats": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in self.seats
+            ],
+        }
@@ -0,0 +1,111 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F
+from django.http import StreamingHttpResponse
+
+from airport import holds, models
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+FLIGHT_FIELDS = (
+    "id",
+    "route",
+    "source",
+    "destination",
+    "airplane",
+    "departure_time",
+    "arrival_time",
+    "tickets_available",
+)
+
+ORDER_FIELDS = (
+    "order",
+    "created_at",
+    "user",
+    "ticket",
+    "flight",
+    "row",
+    "seat",
+)
+
+
+def flight_rows(queryset):
+    """
+    Flights of queryset (annotated with tickets_available) as dicts. Held
+    seats are not available, as in the flight list; they are looked up
+    once per chunk of rows.
+    """
+    rows = (
+        queryset.prefetch_related(None)
+        .values(
+            "id",
+            "route",
+            "airplane",
+            "departure_time",
+            "arrival_time",
+            "tickets_available",
+            source=F("route__source__name"),
+            destination=F("route__destination__name"),
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    store = holds.get_hold_store()
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        held = store.held_counts({row["id"] for row in chunk})
+        for row in chunk:
+            row["tickets_available"] -= held[row["id"]]
+            yield row
+
+
+def order_rows(queryset):
+    """One dict per ticket of the orders of queryset"""
+    return (
+        models.Ticket.objects.filter(order__in=queryset.values("id"))
+        .order_by("order_id", "id")
+        .values(
+            "order",
+            "flight",
+            "row",
+            "seat",
+            created_at=F("order__created_at"),
+            user=F("order__user__email"),
+            ticket=F("id"),
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+async def _pull(chunks):
+    """
+    An async generator over a sync iterator of chunks, fetching each one
+    in the request's sync thread, where its database cursor lives
+    """
+    chunks = iter(chunks)
+    fetch = sync_to_async(next)
+    while (chunk := await fetch(chunks, None)) is not None:
+        yield chunk
+
+
+def stream_response(request, rows, fields, filename) -> StreamingHttpResponse:
+    """
+    Stream rows in the format negotiated for request, so the export never
+    holds more than one chunk of rows in memory. Rows come from
+    QuerySet.iterator(), which uses server-side cursors where the database
+    supports them. Under ASGI the chunks are sent from an async generator:
+    Django would read a sync one to the end before sending anything.
+    """
+    renderer = request.accepted_renderer
+    content = renderer.stream(rows, fields)
+    if isinstance(request._request, ASGIRequest):
+        content = _pull(content)
+    response = StreamingHttpResponse(
+        content,
+        content_type=f"{renderer.media_type}; charset={renderer.charset}",
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{renderer.format}"'
+    )
+    return response
@@ -1,10 +1,49 @@
 from django_filters import rest_framework as filters
-from airport import models
+from rest_framework.filters import SearchFilter
+
+from airport import models, search
+
+
+class RouteSearchFilter(SearchFilter):
+    """
+    ?search= over the names and cities of route airports. Every term has to
+    match the source or the destination airport of the route found through
+    the view's search_route_field.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        route_field = view.search_route_field
+        for term in self.get_search_terms(request):
+            queryset = queryset.filter(
+                **{f"{route_field}__in": search.find_routes(term=term)}
+            )
+        return queryset
+
+
+class RouteFilter(filters.FilterSet):
+    source = filters.CharFilter(method="filter_airport", label="Source airport")
+    destination = filters.CharFilter(
+        method="filter_airport", label="Destination airport"
+    )
+
+    def filter_airport(self, queryset, name, value):
+        return queryset.filter(id__in=search.find_routes(**{name: value}))
+
+    class Meta:
+        model = models.Route
+        fields = ["source", "destination"]
 
 
 class FlightFilter(filters.FilterSet):
     departure_time = filters.DateTimeFromToRangeFilter(field_name="departure_time")
     arrival_time = filters.DateTimeFromToRangeFilter(field_name="arrival_time")
+    source = filters.CharFilter(method="filter_airport", label="Source airport")
+    destination = filters.CharFilter(
+        method="filter_airport", label="Destination airport"
+    )
+
+    def filter_airport(self, queryset, name, value):
+        return queryset.filter(route__in=search.find_routes(**{name: value}))
 
     class Meta:
         model = models.Flight
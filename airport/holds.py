@@ -0,0 +1,250 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+HOLD_TTL = 5 * 60
+SWEEP_INTERVAL = 30
+
+
+def _seat_key(row, seat) -> str:
+    return f"{row}:{seat}"
+
+
+def _parse_seat_key(value) -> tuple[int, int]:
+    if isinstance(value, bytes):
+        value = value.decode()
+    row, seat = value.split(":")
+    return int(row), int(seat)
+
+
+class LocalHoldStore:
+    """
+    In-process seat holds that expire after their ttl.
+
+    Expiry times are kept in a heap, so expired holds are dropped from its
+    top by a daemon sweeper thread and before every read.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._holds = defaultdict(dict)
+        self._expiry = []
+        self._sweeper = None
+
+    def _purge(self) -> None:
+        now = self.clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, flight_id, seat = heapq.heappop(self._expiry)
+            flight_holds = self._holds.get(flight_id, {})
+            if seat in flight_holds and flight_holds[seat][1] == expires_at:
+                del flight_holds[seat]
+                if not flight_holds:
+                    del self._holds[flight_id]
+
+    def _sweep(self) -> None:
+        while True:
+            time.sleep(SWEEP_INTERVAL)
+            with self._lock:
+                self._purge()
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, daemon=True)
+            self._sweeper.start()
+
+    def hold(self, flight_id, seats, owner, ttl=HOLD_TTL) -> tuple[float, set]:
+        """Hold all seats for owner or none, return (expires_at, conflicts)"""
+        owner = str(owner)
+        with self._lock:
+            self._start_sweeper()
+            self._purge()
+            flight_holds = self._holds[flight_id]
+            conflicts = {
+                seat
+                for seat in seats
+                if seat in flight_holds and flight_holds[seat][0] != owner
+            }
+            expires_at = self.clock() + ttl
+            if not conflicts:
+                for seat in seats:
+                    flight_holds[seat] = (owner, expires_at)
+                    heapq.heappush(self._expiry, (expires_at, flight_id, seat))
+            return expires_at, conflicts
+
+    def release(self, flight_id, owner, seats=None) -> int:
+        owner = str(owner)
+        with self._lock:
+            flight_holds = self._holds.get(flight_id, {})
+            released = [
+                seat
+                for seat, (holder, _) in flight_holds.items()
+                if holder == owner and (seats is None or seat in seats)
+            ]
+            for seat in released:
+                del flight_holds[seat]
+            return len(released)
+
+    def held_seats(self, flight_id) -> dict:
+        """Return {(row, seat): owner} of live holds on a flight"""
+        with self._lock:
+            self._purge()
+            return {
+                seat: owner
+                for seat, (owner, _) in self._holds.get(flight_id, {}).items()
+            }
+
+    def held_counts(self, flight_ids) -> dict:
+        with self._lock:
+            self._purge()
+            return {
+                flight_id: len(self._holds.get(flight_id, {}))
+                for flight_id in flight_ids
+            }
+
+
+class RedisHoldStore:
+    """
+    Seat holds in Redis, one sorted set of seats scored by expiry time and
+    one hash of seat owners per flight. Both keys expire with their last
+    hold, and holds are taken and released atomically by Lua scripts.
+    """
+
+    HOLD_SCRIPT = """
+    local owner = ARGV[3]
+    local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+    if #expired > 0 then
+        redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+        redis.call("HDEL", KEYS[2], unpack(expired))
+    end
+    local conflicts = {}
+    for i = 4, #ARGV do
+        local holder = redis.call("HGET", KEYS[2], ARGV[i])
+        if holder and holder ~= owner then
+            table.insert(conflicts, ARGV[i])
+        end
+    end
+    if #conflicts > 0 then
+        return conflicts
+    end
+    for i = 4, #ARGV do
+        redis.call("ZADD", KEYS[1], ARGV[2], ARGV[i])
+        redis.call("HSET", KEYS[2], ARGV[i], owner)
+    end
+    local last = redis.call("ZRANGE", KEYS[1], -1, -1, "WITHSCORES")
+    redis.call("PEXPIREAT", KEYS[1], last[2])
+    redis.call("PEXPIREAT", KEYS[2], last[2])
+    return conflicts
+    """
+
+    RELEASE_SCRIPT = """
+    local seats = {}
+    if #ARGV > 1 then
+        for i = 2, #ARGV do
+            table.insert(seats, ARGV[i])
+        end
+    else
+        local all = redis.call("HGETALL", KEYS[2])
+        for i = 1, #all, 2 do
+            table.insert(seats, all[i])
+        end
+    end
+    local released = 0
+    for _, seat in ipairs(seats) do
+        if redis.call("HGET", KEYS[2], seat) == ARGV[1] then
+            redis.call("HDEL", KEYS[2], seat)
+            redis.call("ZREM", KEYS[1], seat)
+            released = released + 1
+        end
+    end
+    return released
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._hold = connection.register_script(self.HOLD_SCRIPT)
+        self._release = connection.register_script(self.RELEASE_SCRIPT)
+
+    @staticmethod
+    def _keys(flight_id) -> list[str]:
+        return [f"seat_holds:{flight_id}", f"seat_holds:{flight_id}:owners"]
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    def hold(self, flight_id, seats, owner, ttl=HOLD_TTL) -> tuple[float, set]:
+        now = self._now_ms()
+        expires_at = now + int(ttl * 1000)
+        conflicts = self._hold(
+            keys=self._keys(flight_id),
+            args=[now, expires_at, str(owner)]
+            + [_seat_key(row, seat) for row, seat in seats],
+        )
+        return expires_at / 1000, {_parse_seat_key(seat) for seat in conflicts}
+
+    def release(self, flight_id, owner, seats=None) -> int:
+        """Release owner's holds on seats, or on every seat if seats is None"""
+        if seats is not None and not seats:
+            # the script releases every seat when it is given none
+            return 0
+        return self._release(
+            keys=self._keys(flight_id),
+            args=[str(owner)] + [_seat_key(row, seat) for row, seat in seats or ()],
+        )
+
+    def held_seats(self, flight_id) -> dict:
+        seats_key, owners_key = self._keys(flight_id)
+        seats = self.connection.zrangebyscore(seats_key, f"({self._now_ms()}", "+inf")
+        if not seats:
+            return {}
+        owners = self.connection.hmget(owners_key, seats)
+        return {
+            _parse_seat_key(seat): owner.decode()
+            for seat, owner in zip(seats, owners)
+            if owner is not None
+        }
+
+    def held_counts(self, flight_ids) -> dict:
+        flight_ids = list(flight_ids)
+        now = self._now_ms()
+        pipeline = self.connection.pipeline(transaction=False)
+        for flight_id in flight_ids:
+            pipeline.zcount(self._keys(flight_id)[0], f"({now}", "+inf")
+        return dict(zip(flight_ids, pipeline.execute()))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_hold_store():
+    """Redis store when the default cache is django-redis, local otherwise"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.CACHES["default"]["BACKEND"].startswith("django_redis"):
+                _store = RedisHoldStore(get_redis_connection("default"))
+            else:
+                _store = LocalHoldStore()
+        return _store
+
+
+def find_held_seats(seats, owner) -> set:
+    """Return the (flight_id, row, seat) triples held by someone else"""
+    store = get_hold_store()
+    seats_by_flight = defaultdict(set)
+    for flight_id, row, seat in seats:
+        seats_by_flight[flight_id].add((row, seat))
+
+    held = set()
+    for flight_id, flight_seats in seats_by_flight.items():
+        for (row, seat), holder in store.held_seats(flight_id).items():
+            if (row, seat) in flight_seats and holder != str(owner):
+                held.add((flight_id, row, seat))
+    return held
@@ -0,0 +1,462 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.utils import timezone as django_timezone
+
+from airport import holds, models
+
+
+VERSION_KEY = "itinerary_index_version"
+CHANGE_KEY = "itinerary_index_change:{}"
+CHANGE_TIMEOUT = 60 * 60
+# a process further behind than this rebuilds its index instead of
+# replaying the changes it missed
+MAX_REPLAYED_CHANGES = 1000
+MIN_CONNECTION = timedelta(minutes=45)
+MAX_CONNECTION = timedelta(hours=24)
+MAX_LEGS = 3
+MAX_EXPANSIONS = 50_000
+MAX_SEARCHES = 5
+SORT_KEYS = ("duration", "arrival", "distance")
+
+_index = None
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Itinerary:
+    flights: tuple
+    departure: float
+    arrival: float
+    distance: int
+
+
+class RouteIndex:
+    """
+    The route graph with its flights, kept in memory for itinerary search.
+
+    Routes are grouped by source and destination airport and the flights
+    of every route are kept sorted by departure, so the flights leaving an
+    airport in a connection window are found by bisection. Times are epoch
+    seconds. min_duration is a lower bound of the flight time of a route:
+    it is lowered when flights are added and never raised on removal.
+
+    Searches read an index without a lock while one writer at a time
+    changes it. A change never edits a set or list in place: it replaces
+    the route set of an airport or the departures of a route, so a search
+    sees each of them either before or after the change. Searches skip
+    routes and flights removed while they run.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.routes = {}
+        self.outgoing = defaultdict(set)
+        self.incoming = defaultdict(set)
+        self.departures = defaultdict(list)
+        self.flights = {}
+        self.min_duration = {}
+
+    @classmethod
+    def build(cls, version=None, since: datetime = None) -> "RouteIndex":
+        index = cls(version)
+        for route in models.Route.objects.values_list(
+            "id", "source_id", "destination_id", "distance"
+        ):
+            index.add_route(*route)
+
+        flights = models.Flight.objects.order_by().values_list(
+            "id", "route_id", "departure_time", "arrival_time"
+        )
+        if since is not None:
+            flights = flights.filter(departure_time__gte=since)
+        for flight_id, route_id, departure, arrival in flights.iterator():
+            departure, arrival = departure.timestamp(), arrival.timestamp()
+            index.flights[flight_id] = (route_id, departure, arrival)
+            index.departures[route_id].append((departure, flight_id, arrival))
+            index._lower_duration(route_id, arrival - departure)
+        for departures in index.departures.values():
+            departures.sort()
+        return index
+
+    def _lower_duration(self, route_id, duration: float) -> None:
+        if duration < self.min_duration.get(route_id, float("inf")):
+            self.min_duration[route_id] = duration
+
+    def add_route(self, route_id, source_id, destination_id, distance) -> None:
+        if route_id in self.routes:
+            old_source, old_destination, _ = self.routes[route_id]
+            self.outgoing[old_source] = self.outgoing[old_source] - {route_id}
+            self.incoming[old_destination] = self.incoming[old_destination] - {route_id}
+        self.routes[route_id] = (source_id, destination_id, distance)
+        self.outgoing[source_id] = self.outgoing[source_id] | {route_id}
+        self.incoming[destination_id] = self.incoming[destination_id] | {route_id}
+
+    def remove_route(self, route_id) -> None:
+        if route_id not in self.routes:
+            return
+        source_id, destination_id, _ = self.routes.pop(route_id)
+        self.outgoing[source_id] = self.outgoing[source_id] - {route_id}
+        self.incoming[destination_id] = self.incoming[destination_id] - {route_id}
+        for _, flight_id, _ in self.departures.pop(route_id, ()):
+            self.flights.pop(flight_id, None)
+        self.min_duration.pop(route_id, None)
+
+    def add_flight(
+        self, flight_id, route_id, departure: datetime, arrival: datetime
+    ) -> None:
+        self.remove_flight(flight_id)
+        departure, arrival = departure.timestamp(), arrival.timestamp()
+        self.flights[flight_id] = (route_id, departure, arrival)
+        departures = list(self.departures.get(route_id, ()))
+        insort(departures, (departure, flight_id, arrival))
+        self.departures[route_id] = departures
+        self._lower_duration(route_id, arrival - departure)
+
+    def remove_flight(self, flight_id) -> None:
+        if flight_id not in self.flights:
+            return
+        route_id, departure, _ = self.flights.pop(flight_id)
+        departures = self.departures[route_id]
+        position = bisect_left(departures, (departure, flight_id))
+        if position < len(departures) and departures[position][1] == flight_id:
+            self.departures[route_id] = (
+                departures[:position] + departures[position + 1 :]
+            )
+
+    def apply(self, change) -> None:
+        """Apply a change published by _publish, a (method, args) pair"""
+        method, args = change
+        getattr(self, method)(*args)
+
+    def _edge_weight(self, route_id, route, sort: str):
+        if sort == "distance":
+            return route[2]
+        return self.min_duration.get(route_id)
+
+    def lower_bounds(self, destination_id, sort: str) -> tuple[dict, dict]:
+        """
+        Return ({airport: least remaining cost}, {airport: fewest legs})
+        to destination_id, found by searching the graph backwards. The
+        costs are the A* heuristic, the legs prune too long itineraries.
+        """
+        costs = {destination_id: 0}
+        queue = [(0, destination_id)]
+        while queue:
+            cost, airport_id = heapq.heappop(queue)
+            if cost > costs[airport_id]:
+                continue
+            for route_id in self.incoming.get(airport_id, ()):
+                route = self.routes.get(route_id)
+                if route is None:
+                    continue
+                weight = self._edge_weight(route_id, route, sort)
+                if weight is None:
+                    continue
+                source_id = route[0]
+                if cost + weight < costs.get(source_id, float("inf")):
+                    costs[source_id] = cost + weight
+                    heapq.heappush(queue, (cost + weight, source_id))
+
+        legs = {destination_id: 0}
+        pending = deque([destination_id])
+        while pending:
+            airport_id = pending.popleft()
+            for route_id in self.incoming.get(airport_id, ()):
+                route = self.routes.get(route_id)
+                if route is None:
+                    continue
+                source_id = route[0]
+                if source_id not in legs:
+                    legs[source_id] = legs[airport_id] + 1
+                    pending.append(source_id)
+        return costs, legs
+
+    def _departing(self, route_id, earliest: float, latest: float):
+        departures = self.departures.get(route_id, ())
+        position = bisect_left(departures, (earliest,))
+        while position < len(departures) and departures[position][0] <= latest:
+            yield departures[position]
+            position += 1
+
+    def search(
+        self,
+        source_id,
+        destination_id,
+        departure_after: datetime,
+        departure_before: datetime,
+        limit: int,
+        max_legs: int = MAX_LEGS,
+        min_connection: timedelta = MIN_CONNECTION,
+        max_connection: timedelta = MAX_CONNECTION,
+        sort: str = "duration",
+        exclude=(),
+    ) -> list[Itinerary]:
+        """
+        Return the limit cheapest itineraries by sort, cheapest first.
+
+        This is an A* search over partial itineraries: the cost of one is
+        its travel time (duration), arrival time (arrival) or distance, and
+        lower_bounds() estimates the rest, so complete itineraries leave
+        the queue in cost order. Airports are never visited twice and the
+        flights in exclude are skipped.
+        """
+        costs, legs_left = self.lower_bounds(destination_id, sort)
+        min_connection = min_connection.total_seconds()
+        max_connection = max_connection.total_seconds()
+
+        queue = []
+        counter = 0
+
+        def push(path, airports, departure, arrival, distance):
+            nonlocal counter
+            if sort == "distance":
+                cost = distance
+            elif sort == "arrival":
+                cost = arrival
+            else:
+                cost = arrival - departure
+            counter += 1
+            heapq.heappush(
+                queue,
+                (
+                    cost + costs[airports[-1]],
+                    counter,
+                    path,
+                    airports,
+                    departure,
+                    arrival,
+                    distance,
+                ),
+            )
+
+        def follow(path, airports, departure, distance, earliest, latest):
+            for route_id in self.outgoing.get(airports[-1], ()):
+                route = self.routes.get(route_id)
+                if route is None:
+                    continue
+                _, next_airport, route_distance = route
+                if (
+                    next_airport in airports
+                    or next_airport not in costs
+                    or len(path) + 1 + legs_left.get(next_airport, max_legs) > max_legs
+                ):
+                    continue
+                for flight_departure, flight_id, flight_arrival in self._departing(
+                    route_id, earliest, latest
+                ):
+                    if flight_id in exclude:
+                        continue
+                    push(
+                        path + (flight_id,),
+                        airports + (next_airport,),
+                        departure if path else flight_departure,
+                        flight_arrival,
+                        distance + route_distance,
+                    )
+
+        if source_id == destination_id or source_id not in costs:
+            return []
+        follow(
+            (),
+            (source_id,),
+            None,
+            0,
+            departure_after.timestamp(),
+            departure_before.timestamp(),
+        )
+
+        found = []
+        expansions = 0
+        while queue and len(found) < limit and expansions < MAX_EXPANSIONS:
+            _, _, path, airports, departure, arrival, distance = heapq.heappop(queue)
+            if airports[-1] == destination_id:
+                found.append(Itinerary(path, departure, arrival, distance))
+                continue
+            expansions += 1
+            follow(
+                path,
+                airports,
+                departure,
+                distance,
+                arrival + min_connection,
+                arrival + max_connection,
+            )
+        return found
+
+
+def _current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # start from the clock so an evicted counter never reuses versions
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump_version() -> int:
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, None)
+        return version
+
+
+def _catch_up(index: RouteIndex, version: int) -> bool:
+    """
+    Replay the changes other processes published since the index was
+    up to date, or return False if some of them are gone from the cache
+    """
+    if not index.version < version <= index.version + MAX_REPLAYED_CHANGES:
+        return index.version == version
+    keys = [
+        CHANGE_KEY.format(number) for number in range(index.version + 1, version + 1)
+    ]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return False
+    with _lock:
+        # another thread may have replayed some of them meanwhile
+        for number in range(index.version + 1, version + 1):
+            index.apply(changes[CHANGE_KEY.format(number)])
+            index.version = number
+    return True
+
+
+def _get_index() -> RouteIndex:
+    """
+    This process' index, brought up to date by replaying the published
+    changes, or rebuilt if it is too far behind. Searches use it without
+    the lock, which only serializes changes.
+    """
+    global _index
+    version = _current_version()
+    index = _index
+    if index is None or not _catch_up(index, version):
+        index = RouteIndex.build(version, since=django_timezone.now())
+        with _lock:
+            _index = index
+    return index
+
+
+def _publish(method: str, *args) -> None:
+    """
+    Apply a committed change to this process' index and publish it under
+    the next shared version, for other processes to replay on their next
+    search. This one replays whatever it missed in between.
+    """
+    change = (method, args)
+    version = _bump_version()
+    cache.set(CHANGE_KEY.format(version), change, CHANGE_TIMEOUT)
+    with _lock:
+        if _index is not None and _index.version == version - 1:
+            _index.apply(change)
+            _index.version = version
+
+
+def route_changed(route_id, source_id=None, destination_id=None, distance=None):
+    """Update or, without source_id, remove a route"""
+    if source_id is None:
+        _publish("remove_route", route_id)
+    else:
+        _publish("add_route", route_id, source_id, destination_id, distance)
+
+
+def flight_changed(flight_id, route_id=None, departure=None, arrival=None):
+    """Update or, without route_id, remove a flight"""
+    if route_id is None:
+        _publish("remove_flight", flight_id)
+    else:
+        _publish("add_flight", flight_id, route_id, departure, arrival)
+
+
+def invalidate() -> None:
+    """Rebuild every index, for writes that bypass model signals"""
+    global _index
+    with _lock:
+        # a version without a published change can't be replayed
+        _bump_version()
+        _index = None
+
+
+def _load_flights(flight_ids) -> dict:
+    flights = (
+        models.Flight.objects.select_related(
+            "airplane", "route__source", "route__destination"
+        )
+        .with_tickets_available()
+        .in_bulk(flight_ids)
+    )
+    held = holds.get_hold_store().held_counts(flights)
+    for flight in flights.values():
+        flight.seats_held = held[flight.id]
+    return flights
+
+
+def find_itineraries(
+    source,
+    destination,
+    departure_after: datetime,
+    departure_before: datetime,
+    passengers: int = 1,
+    limit: int = 5,
+    **options,
+) -> list[dict]:
+    """
+    The best limit itineraries from source to destination airport with
+    passengers free seats on every leg.
+
+    Seats change too often to be indexed, so the found flights are loaded
+    with their availability and the search is repeated without the full
+    ones until every itinerary found has room.
+    """
+    index = _get_index()
+    flights = {}
+    full = set()
+    for _ in range(MAX_SEARCHES):
+        found = index.search(
+            source.id,
+            destination.id,
+            departure_after,
+            departure_before,
+            limit,
+            exclude=full,
+            **options,
+        )
+        missing = {
+            flight_id
+            for itinerary in found
+            for flight_id in itinerary.flights
+            if flight_id not in flights
+        }
+        flights.update(_load_flights(missing))
+        newly_full = {
+            flight_id
+            for flight_id in missing
+            if flight_id not in flights
+            or flights[flight_id].tickets_available - flights[flight_id].seats_held
+            < passengers
+        }
+        if not newly_full:
+            break
+        full |= newly_full
+
+    return [
+        {
+            "legs": [flights[flight_id] for flight_id in itinerary.flights],
+            "departure_time": datetime.fromtimestamp(itinerary.departure, timezone.utc),
+            "arrival_time": datetime.fromtimestamp(itinerary.arrival, timezone.utc),
+            "duration": timedelta(seconds=itinerary.arrival - itinerary.departure),
+            "distance": itinerary.distance,
+            "connections": len(itinerary.flights) - 1,
+        }
+        for itinerary in found
+        if not full.intersection(itinerary.flights)
+    ]
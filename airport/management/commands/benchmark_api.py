@@ -0,0 +1,83 @@
+import dataclasses
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand
+
+from airport import models
+from airport.benchmarks.api import run_benchmarks
+from airport.benchmarks.database import analyze, benchmark_database
+from airport.benchmarks.seed import SCALES, seed, seeded_ids
+
+
+class Command(BaseCommand):
+    """Django command to time the main API endpoints on synthetic data"""
+
+    help = (
+        "Seed a throwaway copy of the database with synthetic data and "
+        "report p50/p95 latency, query counts and peak memory of flight "
+        "list and detail, order create and order list as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--flights", type=int, help="Override the scale")
+        parser.add_argument("--tickets", type=int, help="Override the scale")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--output", help="Write the JSON report to a file")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded database and reuse it on the next run",
+        )
+
+    def handle(self, *args, **options):
+        scale = SCALES[options["scale"]]
+        overrides = {
+            name: options[name]
+            for name in ("flights", "tickets")
+            if options[name] is not None
+        }
+        scale = dataclasses.replace(scale, **overrides)
+
+        with benchmark_database(keepdb=options["keepdb"]) as connection:
+            if options["keepdb"] and models.Flight.objects.exists():
+                ids = seeded_ids()
+                self.stdout.write("Reusing the seeded database")
+            else:
+                started = time.perf_counter()
+                ids = seed(scale, seed=options["seed"], log=self.stdout.write)
+                analyze()
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+            scenarios = run_benchmarks(
+                ids, iterations=options["iterations"], warmup=options["warmup"]
+            )
+            report = {
+                "environment": {
+                    "database": connection.vendor,
+                    "django": django.get_version(),
+                    "python": platform.python_version(),
+                },
+                "scale": dataclasses.asdict(scale),
+                "seed": options["seed"],
+                "scenarios": scenarios,
+            }
+
+        for name, result in scenarios.items():
+            self.stdout.write(
+                f"{name:<28} p50 {result['p50_ms']:>9.2f} ms  "
+                f"p95 {result['p95_ms']:>9.2f} ms  "
+                f"{result['queries']:>3} queries  "
+                f"{result['peak_memory_kb']:>9.1f} KiB"
+            )
+        report_json = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report_json + "\n")
+        else:
+            self.stdout.write(report_json)
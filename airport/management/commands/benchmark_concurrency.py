@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport import models
+from airport.benchmarks.concurrency import (
+    benchmark_tokens,
+    compare_connection_reuse,
+    compare_in_process,
+    compare_servers,
+    endpoints,
+)
+from airport.benchmarks.database import benchmark_database
+from airport.benchmarks.seed import SCALES, seed, seeded_ids
+
+
+class Command(BaseCommand):
+    """Django command to compare sync and async flight views under load"""
+
+    help = (
+        "Send concurrent GETs to the flight list, detail and seat "
+        "availability views and their async twins, and report throughput "
+        "and p50/p95 latency of the WSGI and ASGI paths as JSON. Runs "
+        "in-process on a seeded throwaway database, or over HTTP against "
+        "running servers with --wsgi-url and --asgi-url. In-process runs "
+        "also count the database connections opened with and without "
+        "persistent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--wsgi-url", help="e.g. http://localhost:8000")
+        parser.add_argument("--asgi-url", help="e.g. http://localhost:8001")
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE to compare with 0 in-process",
+        )
+
+    def handle(self, *args, **options):
+        if bool(options["wsgi_url"]) != bool(options["asgi_url"]):
+            raise CommandError("Pass both --wsgi-url and --asgi-url or neither")
+
+        reuse = None
+        if options["wsgi_url"]:
+            # the servers share this database; the load users are created in it
+            if not models.Flight.objects.exists():
+                raise CommandError("The database has no flights to request")
+            results = compare_servers(
+                endpoints(seeded_ids()["flights"]),
+                benchmark_tokens(options["clients"]),
+                options["requests"],
+                options["wsgi_url"],
+                options["asgi_url"],
+            )
+        else:
+            with benchmark_database():
+                ids = seed(SCALES[options["scale"]], seed=options["seed"])
+                paths = endpoints(ids["flights"])
+                tokens = benchmark_tokens(options["clients"])
+                results = compare_in_process(paths, tokens, options["requests"])
+                reuse = compare_connection_reuse(
+                    paths["flight detail"][0],
+                    tokens,
+                    options["requests"],
+                    max_ages=(0, options["conn_max_age"]),
+                )
+
+        for name, result in results.items():
+            for path, numbers in result.items():
+                self.stdout.write(
+                    f"{name:<18} {path}  "
+                    f"{numbers['throughput_rps']:>8.1f} req/s  "
+                    f"p50 {numbers['p50_ms']:>8.2f} ms  "
+                    f"p95 {numbers['p95_ms']:>8.2f} ms  "
+                    f"{numbers['errors']} errors"
+                )
+        for max_age, numbers in (reuse or {}).items():
+            self.stdout.write(
+                f"flight detail, {max_age:<16}  "
+                f"{numbers['throughput_rps']:>8.1f} req/s  "
+                f"p50 {numbers['p50_ms']:>8.2f} ms  "
+                f"{numbers['connections_opened']} connections opened"
+            )
+        if reuse:
+            results["connection reuse"] = reuse
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport import models
+from airport.benchmarks.database import analyze, benchmark_database
+from airport.benchmarks.query_plans import check_query_plans
+from airport.benchmarks.seed import SCALES, seed, seeded_ids
+
+
+class Command(BaseCommand):
+    """Django command to check that hot queries use the composite indexes"""
+
+    help = (
+        "Seed a throwaway copy of the database with synthetic flights and "
+        "tickets and EXPLAIN the queries behind flight filters, cursor pages, "
+        "order history and seat maps"
+    )
+
+    def add_arguments(self, parser):
+        # on tiny tables planners rightly prefer a scan to any index
+        parser.add_argument(
+            "--scale",
+            choices=[scale for scale in SCALES if scale != "tiny"],
+            default="large",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded database and reuse it on the next run",
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options["keepdb"]):
+            if options["keepdb"] and models.Flight.objects.exists():
+                ids = seeded_ids()
+                self.stdout.write("Reusing the seeded database")
+            else:
+                started = time.perf_counter()
+                ids = seed(
+                    SCALES[options["scale"]],
+                    seed=options["seed"],
+                    log=self.stdout.write,
+                )
+                analyze()
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+            checks = check_query_plans(
+                route_id=ids["routes"][0],
+                user_id=ids["users"][0],
+                flight_id=ids["flights"][0],
+            )
+            for check in checks:
+                style = self.style.SUCCESS if check.ok else self.style.ERROR
+                self.stdout.write(style(f"{'OK' if check.ok else 'FAIL'} {check.name}"))
+                for line in check.plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if not all(check.ok for check in checks):
+            raise CommandError("Some queries don't use the expected indexes")
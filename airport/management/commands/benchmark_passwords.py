@@ -0,0 +1,44 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from airport.benchmarks.database import benchmark_database
+from airport.benchmarks.passwords import compare_hashers
+
+
+class Command(BaseCommand):
+    """Django command to compare password hashers under registration load"""
+
+    help = (
+        "Register users and obtain their tokens through the API in a "
+        "throwaway database with each password hasher preferred, and report "
+        "registrations per second, token latency and whether older hashes "
+        "are upgraded on login as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hashers",
+            nargs="+",
+            choices=settings.HASHERS,
+            default=list(settings.HASHERS),
+        )
+        parser.add_argument("--users", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            results = compare_hashers(options["hashers"], users=options["users"])
+
+        for name, result in results["hashers"].items():
+            if "error" in result:
+                self.stdout.write(f"{name:<7} {result['error']}")
+                continue
+            self.stdout.write(
+                f"{name:<7} "
+                f"{result['registrations_per_second']:>7.1f} registrations/s  "
+                f"token p50 {result['token_obtain']['p50_ms']:>8.2f} ms  "
+                f"pbkdf2 hash stored as "
+                f"{result['rehash_from_pbkdf2']['stored_algorithm']} after login"
+            )
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,46 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from airport.benchmarks.profiles import compare_profiles
+from airport.benchmarks.seed import SCALES
+
+
+class Command(BaseCommand):
+    """Django command to compare the startup and request cost of profiles"""
+
+    help = (
+        "Start Django in a fresh process with each settings profile and "
+        "report the startup time, modules loaded and the p50/p95 latency "
+        "of the benchmark_api scenarios as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+", choices=settings.PROFILES, default=["dev", "prod"]
+        )
+        parser.add_argument("--scale", choices=SCALES, default="tiny")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--iterations", type=int, default=50)
+
+    def handle(self, *args, **options):
+        results = compare_profiles(
+            options["profiles"],
+            runs=options["runs"],
+            iterations=options["iterations"],
+            scale=options["scale"],
+        )
+
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<5} startup {result['startup_ms']:>7.1f} ms  "
+                f"{result['modules']} modules"
+            )
+            for name, scenario in result["scenarios"].items():
+                self.stdout.write(
+                    f"      {name:<28} p50 {scenario['p50_ms']:>8.2f} ms  "
+                    f"p95 {scenario['p95_ms']:>8.2f} ms  "
+                    f"{scenario['peak_memory_kb']:>8.1f} KiB"
+                )
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,69 @@
+import dataclasses
+import json
+
+from django.core.management.base import BaseCommand
+
+from airport import models
+from airport.benchmarks.database import benchmark_database
+from airport.benchmarks.seed import SCALES, seed
+from airport.benchmarks.serializers import (
+    compare_list_serializers,
+    compare_renderers,
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare list serializers and renderers on synthetic data"""
+
+    help = (
+        "Seed a throwaway copy of the database and time the flight and route "
+        "list serializers against their .values() read path, and DRF's "
+        "JSONRenderer against FastJSONRenderer, as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--flights", type=int, help="Override the scale")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded database and reuse it on the next run",
+        )
+
+    def handle(self, *args, **options):
+        scale = SCALES[options["scale"]]
+        if options["flights"] is not None:
+            scale = dataclasses.replace(scale, flights=options["flights"])
+
+        with benchmark_database(keepdb=options["keepdb"]):
+            if not (options["keepdb"] and models.Flight.objects.exists()):
+                seed(scale, seed=options["seed"], log=self.stdout.write)
+            results = compare_list_serializers(
+                rows=options["rows"], repeat=options["repeat"]
+            )
+            renderers = compare_renderers(
+                rows=options["rows"], repeat=options["repeat"]
+            )
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} {result['rows']:>6} rows  "
+                f"serializer {result['model_serializer_ms']:>9.2f} ms  "
+                f"values {result['values_serializer_ms']:>9.2f} ms  "
+                f"x{result['serializer_speedup']:<6} "
+                f"identical: {result['identical']}"
+            )
+        for name, result in renderers.items():
+            self.stdout.write(
+                f"{name:<14} {result['bytes']:>9} bytes  "
+                f"JSONRenderer {result['json_renderer_ms']:>8.2f} ms  "
+                f"FastJSONRenderer {result['fast_renderer_ms']:>8.2f} ms  "
+                f"x{result['speedup']:<6} "
+                f"identical: {result['identical']}"
+            )
+        self.stdout.write(
+            json.dumps({"serializers": results, "renderers": renderers}, indent=2)
+        )
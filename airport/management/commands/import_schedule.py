@@ -0,0 +1,72 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from airport import itineraries, models
+from airport.schedule import BATCH_SIZE, ScheduleImport, batches, read_rows
+from airport.signals import invalidate_cached_responses
+
+
+class Command(BaseCommand):
+    """Django command to bulk load a flight schedule from files"""
+
+    help = (
+        "Import flights from CSV, JSON Lines or JSON files with the columns "
+        "route, airplane, departure_time, arrival_time and crew "
+        "(';' separated in CSV). References are ids or names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", type=Path)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Import the valid rows even if some rows are invalid",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the files",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = 0
+        with transaction.atomic():
+            schedule = ScheduleImport.load()
+            for path in options["files"]:
+                try:
+                    for batch in batches(read_rows(path), options["batch_size"]):
+                        rows += len(batch)
+                        valid = schedule.parse(batch)
+                        if not options["dry_run"]:
+                            schedule.write(valid)
+                        if options["verbosity"] > 1:
+                            self.stdout.write(f"{path}: {rows} rows read")
+                except (OSError, ValueError) as error:
+                    raise CommandError(f"{path}: {error}")
+
+            for location, message in schedule.errors:
+                self.stderr.write(f"{location}: {message}")
+            if schedule.errors and not options["skip_invalid"]:
+                raise CommandError(
+                    f"{len(schedule.errors)} invalid rows, nothing imported"
+                )
+            if schedule.imported:
+                # bulk_create sends no signals, so invalidate what they would
+                invalidate_cached_responses(models.Flight)
+                transaction.on_commit(itineraries.invalidate)
+
+        elapsed = time.perf_counter() - started
+        if options["dry_run"]:
+            summary = f"Checked {rows} rows, {rows - len(schedule.errors)} valid"
+        else:
+            summary = f"Imported {schedule.imported} of {rows} flights"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary} in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)"
+            )
+        )
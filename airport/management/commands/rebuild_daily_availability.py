@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from airport import availability
+
+
+class Command(BaseCommand):
+    """Django command to recount the daily availability of every route"""
+
+    help = (
+        "Recount flights and seats per route and day from the flights, "
+        "after bulk changes that bypassed the incremental refresh"
+    )
+
+    def handle(self, *args, **options):
+        days = availability.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {days} route days"))
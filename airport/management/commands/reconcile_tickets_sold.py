@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport import availability
+from airport.models import Flight, Ticket
+
+
+class Command(BaseCommand):
+    """Django command to fix Flight.tickets_sold counters that drifted"""
+
+    help = "Recount tickets per flight and fix drifted tickets_sold counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights without updating them",
+        )
+
+    def handle(self, *args, **options):
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        drifted = (
+            Flight.objects.annotate(actual=Coalesce(Subquery(sold), 0))
+            .exclude(tickets_sold=F("actual"))
+            .values_list("id", "tickets_sold", "actual")
+        )
+
+        fixed = []
+        for flight_id, tickets_sold, actual in drifted.iterator():
+            self.stdout.write(
+                f"Flight {flight_id}: tickets_sold {tickets_sold}, actual {actual}"
+            )
+            if options["dry_run"]:
+                continue
+            with transaction.atomic():
+                # lock the flight so bookings can't change the count meanwhile
+                flight = Flight.objects.select_for_update().filter(pk=flight_id).first()
+                if flight is None:
+                    continue
+                if Flight.objects.filter(pk=flight_id).update(
+                    tickets_sold=Ticket.objects.filter(flight_id=flight_id).count()
+                ):
+                    fixed.append(flight_id)
+
+        availability.refresh_flights(fixed)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(fixed)} flights"))
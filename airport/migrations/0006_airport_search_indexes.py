@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+SEARCH_FIELDS = ("name", "closest_big_city")
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for field in SEARCH_FIELDS:
+        if vendor == "postgresql":
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            # matches the UPPER(...) LIKE UPPER(...) Django emits for icontains
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS airport_{field}_trgm_idx "
+                f"ON airport_airport USING gin (UPPER({field}) gin_trgm_ops)"
+            )
+        elif vendor == "sqlite":
+            # case-insensitive LIKE 'prefix%' can only use NOCASE indexes
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS airport_{field}_nocase_idx "
+                f"ON airport_airport ({field} COLLATE NOCASE)"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    for field in SEARCH_FIELDS:
+        for suffix in ("trgm", "nocase"):
+            schema_editor.execute(f"DROP INDEX IF EXISTS airport_{field}_{suffix}_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_flight_order_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
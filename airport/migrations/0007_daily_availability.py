@@ -0,0 +1,75 @@
+# Generated by Django 5.0.8 on 2026-10-18 07:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import Greatest, TruncDate
+
+
+def count_daily_availability(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    DailyAvailability = apps.get_model("airport", "DailyAvailability")
+    capacity = F("airplane__rows") * F("airplane__seats_in_row")
+    available = Greatest(capacity - F("tickets_sold"), 0)
+    rows = (
+        Flight.objects.order_by()
+        .annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(
+            flights=Count("id"),
+            capacity=Sum(capacity),
+            seats_available=Sum(available),
+            min_seats_available=Min(available),
+        )
+    )
+    DailyAvailability.objects.bulk_create(
+        (DailyAvailability(**row) for row in rows.iterator()), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0006_airport_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("flights", models.PositiveIntegerField()),
+                ("capacity", models.PositiveIntegerField()),
+                ("seats_available", models.PositiveIntegerField()),
+                ("min_seats_available", models.PositiveIntegerField()),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_availability",
+                        to="airport.route",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily availability",
+                "ordering": ["route", "day"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyavailability",
+            constraint=models.UniqueConstraint(
+                fields=("route", "day"), name="daily_availability_route_day"
+            ),
+        ),
+        migrations.RunPython(count_daily_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_daily_availability"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="flight",
+            name="crew",
+            field=models.ManyToManyField(
+                blank=True, related_name="flights", to="airport.crew"
+            ),
+        ),
+    ]
@@ -3,6 +3,7 @@ from datetime import datetime
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.core import validators
 
 
@@ -78,12 +79,24 @@ class Airplane(models.Model):
         ordering = ["name"]
 
 
+class FlightQuerySet(models.QuerySet):
+    def with_tickets_available(self):
+        return self.annotate(
+            tickets_available=models.F("airplane__rows")
+            * models.F("airplane__seats_in_row")
+            - models.F("tickets_sold")
+        )
+
+
 class Flight(models.Model):
     route = models.ForeignKey(Route, on_delete=models.CASCADE)
     airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE)
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights", blank=True)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = FlightQuerySet.as_manager()
 
     @staticmethod
     def validate_departure_and_arrival_time(
@@ -102,13 +115,47 @@ class Flight(models.Model):
 
     def save(self, *args, **kwargs) -> None:
         self.full_clean()
+        if not self._state.adding and not args and "update_fields" not in kwargs:
+            # tickets_sold is only changed by atomic F() updates on booking
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "tickets_sold"
+            ]
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def add_tickets_sold(cls, flight_id, count: int) -> None:
+        cls.objects.filter(pk=flight_id).update(
+            tickets_sold=models.F("tickets_sold") + count
+        )
+
+    @classmethod
+    def recount_tickets_sold(cls, flight_id) -> None:
+        """Set tickets_sold from the flight's tickets, in one query"""
+        sold = (
+            Ticket.objects.filter(flight=models.OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        cls.objects.filter(pk=flight_id).update(
+            tickets_sold=Coalesce(models.Subquery(sold), 0)
+        )
+
     def __str__(self):
         return f"{self.airplane} {self.route}"
 
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+            models.Index(fields=["departure_time", "id"], name="flight_departure_idx"),
+            models.Index(fields=["arrival_time"], name="flight_arrival_idx"),
+        ]
 
 
 class Ticket(models.Model):
@@ -173,3 +220,36 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "id"], name="order_user_created_idx"
+            ),
+        ]
+
+
+class DailyAvailability(models.Model):
+    """
+    Flights and seats of a route on one day, kept up to date from the
+    flights by airport.availability
+    """
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="daily_availability"
+    )
+    day = models.DateField()
+    flights = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+    seats_available = models.PositiveIntegerField()
+    min_seats_available = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.route} {self.day}"
+
+    class Meta:
+        ordering = ["route", "day"]
+        verbose_name_plural = "daily availability"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["route", "day"], name="daily_availability_route_day"
+            ),
+        ]
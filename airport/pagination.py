@@ -0,0 +1,159 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination seeking on the whole unique ordering key.
+
+    DRF's CursorPagination seeks on the first ordering field only and skips
+    ties with an OFFSET. Here every page is one range query on all the
+    ordering fields, so its cost doesn't depend on how deep the page is,
+    and no COUNT(*) is run. The last ordering field must be unique.
+    """
+
+    ordering = ("id",)
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        cursor = self.decode_cursor(request, queryset.model)
+        position, reverse = cursor or (None, False)
+        ordering = self.get_key_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_condition(ordering, position))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_key_ordering(self, reverse: bool) -> list[str]:
+        if not reverse:
+            return list(self.ordering)
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    @staticmethod
+    def get_seek_condition(ordering, position) -> Q:
+        """(a, b) > (x, y) spelled as a > x OR (a = x AND b > y)"""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def get_position(self, instance) -> list:
+        if isinstance(instance, dict):
+            return [instance[field.lstrip("-")] for field in self.ordering]
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], bool(cursor["r"])
+            return self.parse_position(position, model), reverse
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, position, model) -> list:
+        """Check a decoded position against the ordering fields' types"""
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValueError("position doesn't match the ordering")
+        parsed = []
+        for field, value in zip(self.ordering, position):
+            # positions are encoded as JSON numbers or strings, never null
+            if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                raise ValueError(f"invalid {field} in position")
+            value = model._meta.get_field(field.lstrip("-")).to_python(value)
+            if value is None:
+                raise ValueError(f"invalid {field} in position")
+            parsed.append(value)
+        return parsed
+
+    def encode_cursor(self, position, reverse: bool) -> str:
+        cursor = json.dumps({"p": position, "r": int(reverse)}, default=str)
+        encoded = urlsafe_b64encode(cursor.encode()).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+
+class FlightCursorPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "id")
+
+
+class SelectablePaginationMixin:
+    """
+    Use cursor_pagination_class instead of the default pagination when the
+    request asks for it with ?pagination=cursor or carries a cursor.
+    """
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params if self.request else {}
+            if self.cursor_pagination_class is not None and (
+                params.get("pagination") == "cursor"
+                or self.cursor_pagination_class.cursor_query_param in params
+            ):
+                self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination counting and fetching with the async ORM"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        page = queryset[self.offset : self.offset + self.limit]
+        return [row async for row in page.aiterator()]
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renders rows (dicts with the same keys) one by one. stream() encodes
+    an iterable of rows lazily in batches of EXPORT_BATCH_SIZE, render()
+    a list of rows or a single dict such as an error response.
+    """
+
+    charset = "utf-8"
+
+    def start(self, fields) -> str:
+        return ""
+
+    def encode(self, row, fields) -> str:
+        raise NotImplementedError
+
+    def stream(self, rows, fields):
+        batch = [self.start(fields)]
+        for row in rows:
+            batch.append(self.encode(row, fields))
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield "".join(batch)
+                batch = []
+        if batch:
+            yield "".join(batch)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = [data] if isinstance(data, dict) else list(data)
+        fields = list(rows[0]) if rows else []
+        return "".join(self.stream(rows, fields)).encode(self.charset)
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def encode(self, row, fields) -> str:
+        return (
+            json.dumps(
+                {field: row.get(field) for field in fields},
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, (date, datetime, time)):
+            return value.isoformat()
+        return value
+
+    def _write(self, values) -> str:
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerow(values)
+        return self.buffer.getvalue()
+
+    def start(self, fields) -> str:
+        return self._write(fields)
+
+    def encode(self, row, fields) -> str:
+        return self._write([self._value(row.get(field)) for field in fields])
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed. Datetimes,
+    UUIDs and dataclasses are encoded natively, everything else (Decimal,
+    timedelta, lazy strings, querysets) the way DRF's JSONEncoder does.
+    Falls back to the stdlib encoder without orjson and for indented
+    output such as the browsable API's, since orjson only indents by 2.
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(
+            accepted_media_type or "", renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=JSONEncoder().default, option=self.options)
@@ -0,0 +1,170 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport import availability, models
+
+
+BATCH_SIZE = 1000
+FIELDS = ("route", "airplane", "departure_time", "arrival_time", "crew")
+
+
+def read_rows(path: Path):
+    """
+    Yield ("file:line", row) pairs from a CSV, JSON Lines (.jsonl, .ndjson)
+    or JSON (.json) schedule. CSV and JSON Lines are read line by line, a
+    JSON file holds a single array, is loaded at once and numbered by item.
+    """
+    suffix = path.suffix.lower()
+    with path.open(newline="", encoding="utf-8") as file:
+        if suffix == ".csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield f"{path.name}:{reader.line_num}", row
+        elif suffix in (".jsonl", ".ndjson"):
+            for line, text in enumerate(file, start=1):
+                if text.strip():
+                    yield f"{path.name}:{line}", json.loads(text)
+        elif suffix == ".json":
+            for item, row in enumerate(json.load(file), start=1):
+                yield f"{path.name}:{item}", row
+        else:
+            raise ValueError(f"unsupported schedule format: {suffix}")
+
+
+def batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _lookup(queryset, name) -> dict:
+    """Map ids and names of objects to ids, None for ambiguous names"""
+    ids = {}
+    for obj in queryset:
+        ids[str(obj.id)] = obj.id
+        key = name(obj)
+        ids[key] = None if key in ids else obj.id
+    return ids
+
+
+@dataclass
+class ScheduleImport:
+    """
+    Turns schedule rows into flights with all references resolved from
+    maps loaded once up front: routes by id or "Source-Destination" name,
+    airplanes by id or name and crew by id or full name.
+    """
+
+    routes: dict = field(default_factory=dict)
+    airplanes: dict = field(default_factory=dict)
+    crew: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+    imported: int = 0
+
+    @classmethod
+    def load(cls) -> "ScheduleImport":
+        return cls(
+            routes=_lookup(
+                models.Route.objects.select_related("source", "destination").order_by(),
+                str,
+            ),
+            airplanes=_lookup(
+                models.Airplane.objects.only("id", "name").order_by(), str
+            ),
+            crew=_lookup(
+                models.Crew.objects.only("id", "first_name", "last_name").order_by(),
+                lambda crew: crew.full_name,
+            ),
+        )
+
+    @staticmethod
+    def _resolve(ids: dict, value, label: str):
+        value = str(value).strip()
+        if value not in ids:
+            raise ValidationError(f"unknown {label} {value!r}")
+        if ids[value] is None:
+            raise ValidationError(f"ambiguous {label} {value!r}, use its id")
+        return ids[value]
+
+    @staticmethod
+    def _datetime(value, label: str):
+        try:
+            moment = parse_datetime(str(value).strip())
+        except ValueError:
+            # well formed but impossible, like February 30th
+            moment = None
+        if moment is None:
+            raise ValidationError(f"{label} {value!r} is not an ISO 8601 datetime")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def _crew_ids(self, value) -> list:
+        if not value:
+            return []
+        names = value if isinstance(value, list) else str(value).split(";")
+        return [
+            self._resolve(self.crew, name, "crew member")
+            for name in names
+            if str(name).strip()
+        ]
+
+    def parse(self, batch) -> list[tuple]:
+        """Return (flight, crew_ids) of the valid rows, record the others"""
+        parsed = []
+        for location, row in batch:
+            try:
+                if not isinstance(row, dict):
+                    raise ValidationError("expected an object")
+                missing = [name for name in FIELDS[:4] if not row.get(name)]
+                if missing:
+                    raise ValidationError(f"missing {', '.join(missing)}")
+                flight = models.Flight(
+                    route_id=self._resolve(self.routes, row["route"], "route"),
+                    airplane_id=self._resolve(
+                        self.airplanes, row["airplane"], "airplane"
+                    ),
+                    departure_time=self._datetime(
+                        row["departure_time"], "departure_time"
+                    ),
+                    arrival_time=self._datetime(row["arrival_time"], "arrival_time"),
+                )
+                crew_ids = self._crew_ids(row.get("crew"))
+            except ValidationError as error:
+                self.errors.append((location, " ".join(error.messages)))
+                continue
+            parsed.append((location, flight, crew_ids))
+
+        valid = []
+        for location, flight, crew_ids in parsed:
+            try:
+                models.Flight.validate_departure_and_arrival_time(
+                    flight.arrival_time, flight.departure_time, ValidationError
+                )
+            except ValidationError as error:
+                self.errors.append((location, " ".join(error.messages)))
+                continue
+            valid.append((flight, crew_ids))
+        return valid
+
+    def write(self, valid) -> None:
+        """Insert the flights of a batch and their crew in two queries"""
+        flights = models.Flight.objects.bulk_create(flight for flight, _ in valid)
+        through = models.Flight.crew.through
+        through.objects.bulk_create(
+            through(flight_id=flight.id, crew_id=crew_id)
+            for flight, (_, crew_ids) in zip(flights, valid)
+            for crew_id in dict.fromkeys(crew_ids)
+        )
+        availability.days_changed(
+            (flight.route_id, availability.flight_day(flight.departure_time))
+            for flight in flights
+        )
+        self.imported += len(flights)
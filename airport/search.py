@@ -0,0 +1,39 @@
+from django.db import connection
+from django.db.models import Q
+
+from airport import models
+
+
+def airport_lookup() -> str:
+    """
+    icontains is served by trigram indexes on PostgreSQL, other databases
+    only get NOCASE prefix indexes, see migration 0006_airport_search_indexes
+    """
+    return "icontains" if connection.vendor == "postgresql" else "istartswith"
+
+
+def find_airports(term: str):
+    """Airports whose name or closest big city matches term"""
+    lookup = airport_lookup()
+    return models.Airport.objects.filter(
+        Q(**{f"name__{lookup}": term}) | Q(**{f"closest_big_city__{lookup}": term})
+    ).values("id")
+
+
+def find_routes(term: str = None, source: str = None, destination: str = None):
+    """
+    Routes touching an airport matching term, starting at an airport
+    matching source and ending at one matching destination. The small
+    airport table is searched first, routes are then found by foreign key.
+    """
+    routes = models.Route.objects.all()
+    if term:
+        airports = find_airports(term)
+        routes = routes.filter(
+            Q(source_id__in=airports) | Q(destination_id__in=airports)
+        )
+    if source:
+        routes = routes.filter(source_id__in=find_airports(source))
+    if destination:
+        routes = routes.filter(destination_id__in=find_airports(destination))
+    return routes.values("id")
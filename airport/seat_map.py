@@ -0,0 +1,223 @@
+import base64
+import itertools
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.core.cache import cache
+
+from airport import models
+
+
+CACHE_KEY = "seat_map:{}"
+CACHE_TIMEOUT = 60 * 60
+
+_local_lock = threading.Lock()
+
+
+class SeatMap:
+    """
+    Occupancy of a flight as a bitset of rows * seats_in_row seats. Places
+    outside the airplane, left by tickets or holds made before it was
+    swapped for a smaller one, are never in the map.
+    """
+
+    __slots__ = ("rows", "seats_in_row", "bits")
+
+    def __init__(self, rows: int, seats_in_row: int, bits: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = bytearray(bits or (rows * seats_in_row + 7) // 8)
+
+    @classmethod
+    def for_airplane(cls, airplane, seats=()) -> "SeatMap":
+        """A map of the (row, seat) places that fit the airplane"""
+        seat_map = cls(airplane.rows, airplane.seats_in_row)
+        for row, seat in seats:
+            seat_map.add(row, seat)
+        return seat_map
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken(self) -> int:
+        return int.from_bytes(self.bits, "big").bit_count()
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.taken
+
+    def fits(self, airplane) -> bool:
+        return (self.rows, self.seats_in_row) == (
+            airplane.rows,
+            airplane.seats_in_row,
+        )
+
+    def has_place(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row: int, seat: int) -> tuple[int, int]:
+        index = (row - 1) * self.seats_in_row + seat - 1
+        return index // 8, 1 << (7 - index % 8)
+
+    def __contains__(self, place) -> bool:
+        if not self.has_place(*place):
+            return False
+        byte, mask = self._position(*place)
+        return bool(self.bits[byte] & mask)
+
+    def add(self, row: int, seat: int) -> None:
+        """Mark a place taken, ignoring places outside the airplane"""
+        if self.has_place(row, seat):
+            byte, mask = self._position(row, seat)
+            self.bits[byte] |= mask
+
+    def discard(self, row: int, seat: int) -> None:
+        if self.has_place(row, seat):
+            byte, mask = self._position(row, seat)
+            self.bits[byte] &= ~mask
+
+    def taken_seats(self) -> list[tuple[int, int]]:
+        return [
+            (row, seat)
+            for row in range(1, self.rows + 1)
+            for seat in range(1, self.seats_in_row + 1)
+            if (row, seat) in self
+        ]
+
+    def _bit_string(self) -> str:
+        """One character per seat, row by row, "1" for taken"""
+        return format(int.from_bytes(self.bits, "big"), f"0{len(self.bits) * 8}b")[
+            : self.capacity
+        ]
+
+    def encode(self) -> str:
+        """The bitset in base64, seat (1, 1) in the high bit of the first byte"""
+        return base64.b64encode(self.bits).decode("ascii")
+
+    def runs(self) -> list[int]:
+        """
+        Lengths of alternating runs of free and taken seats, row by row and
+        starting with free ones, so [0, 3, 57] is 3 taken then 57 free seats
+        """
+        runs = [len(list(group)) for _, group in itertools.groupby(self._bit_string())]
+        if self.bits and self.bits[0] & 0x80:
+            runs.insert(0, 0)
+        return runs
+
+    def available_by_row(self) -> list[int]:
+        bits = self._bit_string()
+        return [
+            self.seats_in_row - bits.count("1", start, start + self.seats_in_row)
+            for start in range(0, self.capacity, self.seats_in_row)
+        ]
+
+    def __or__(self, other: "SeatMap") -> "SeatMap":
+        """Seats taken in either map"""
+        return SeatMap(
+            self.rows,
+            self.seats_in_row,
+            bytes(mine | theirs for mine, theirs in zip(self.bits, other.bits)),
+        )
+
+    def dump(self) -> tuple:
+        return self.rows, self.seats_in_row, bytes(self.bits)
+
+    @classmethod
+    def load(cls, value) -> "SeatMap":
+        return cls(*value)
+
+
+def _cache_key(flight_id) -> str:
+    return CACHE_KEY.format(flight_id)
+
+
+@contextmanager
+def _locked(*flight_ids):
+    # django-redis exposes a distributed lock, other backends are per process
+    if hasattr(cache, "lock"):
+        with ExitStack() as stack:
+            # always in the same order, so two callers never deadlock
+            for flight_id in sorted(set(flight_ids)):
+                stack.enter_context(
+                    cache.lock(_cache_key(flight_id) + ":lock", timeout=5)
+                )
+            yield
+    else:
+        with _local_lock:
+            yield
+
+
+def _cached_maps(flights) -> dict:
+    cached = cache.get_many([_cache_key(flight_id) for flight_id in flights])
+    seat_maps = {}
+    for flight_id, flight in flights.items():
+        value = cached.get(_cache_key(flight_id))
+        if value is not None:
+            seat_map = SeatMap.load(value)
+            if seat_map.fits(flight.airplane):
+                seat_maps[flight_id] = seat_map
+    return seat_maps
+
+
+def get_seat_maps(flights) -> dict:
+    """
+    Return {flight_id: SeatMap} for flights with loaded airplanes.
+
+    Cached maps are fetched in one round trip, the missing ones are built
+    from a single query over their tickets and cached. Tickets that no
+    longer fit a flight's airplane are left out. Maps are built under
+    the same locks as update_seat_map takes, so a booking committed while
+    a map is built is either read from the database or applied after.
+    """
+    flights = {flight.id: flight for flight in flights}
+    seat_maps = _cached_maps(flights)
+    if len(seat_maps) == len(flights):
+        return seat_maps
+
+    with _locked(*(flight_id for flight_id in flights if flight_id not in seat_maps)):
+        # another request may have built them while this one waited
+        seat_maps = _cached_maps(flights)
+        missing = {
+            flight_id: SeatMap.for_airplane(flight.airplane)
+            for flight_id, flight in flights.items()
+            if flight_id not in seat_maps
+        }
+        for flight_id, row, seat in models.Ticket.objects.filter(
+            flight_id__in=missing
+        ).values_list("flight_id", "row", "seat"):
+            missing[flight_id].add(row, seat)
+        cache.set_many(
+            {
+                _cache_key(flight_id): seat_map.dump()
+                for flight_id, seat_map in missing.items()
+            },
+            CACHE_TIMEOUT,
+        )
+    seat_maps.update(missing)
+    return seat_maps
+
+
+def get_seat_map(flight) -> SeatMap:
+    return get_seat_maps([flight])[flight.id]
+
+
+def update_seat_map(flight_id, seats, taken: bool = True) -> None:
+    """Mark seats taken or free in an already cached map"""
+    with _locked(flight_id):
+        value = cache.get(_cache_key(flight_id))
+        if value is None:
+            return
+        seat_map = SeatMap.load(value)
+        for row, seat in seats:
+            if taken:
+                seat_map.add(row, seat)
+            else:
+                seat_map.discard(row, seat)
+        cache.set(_cache_key(flight_id), seat_map.dump(), CACHE_TIMEOUT)
+
+
+def forget_seat_map(flight_id) -> None:
+    with _locked(flight_id):
+        cache.delete(_cache_key(flight_id))
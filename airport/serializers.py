@@ -1,8 +1,14 @@
-from django.db import transaction
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F
+from django.db.models.manager import BaseManager
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework import exceptions
 
-from airport import models
+from airport import availability, booking, holds, itineraries, models, seat_map
 
 
 class AirportSerializer(serializers.ModelSerializer):
@@ -32,6 +38,43 @@ class RouteListSerializer(RouteSerializer):
         fields = ("id", "source", "destination", "distance")
 
 
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Read only serializer of the dicts fetched by values(queryset).
+
+    List pages render the same JSON as their ModelSerializer from only the
+    columns they need, without building model instances or going through
+    every field's get_attribute/to_representation.
+    """
+
+    datetime = staticmethod(serializers.DateTimeField().to_representation)
+
+    @staticmethod
+    def values(queryset):
+        raise NotImplementedError
+
+
+class RouteListValuesSerializer(ValuesSerializer):
+    """RouteListSerializer output"""
+
+    @staticmethod
+    def values(queryset):
+        return queryset.values(
+            "id",
+            "distance",
+            source_name=F("source__name"),
+            destination_name=F("destination__name"),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "source": row["source_name"],
+            "destination": row["destination_name"],
+            "distance": row["distance"],
+        }
+
+
 class RouteDetailSerializer(RouteSerializer):
     source = AirportSerializer()
     destination = AirportSerializer()
@@ -53,6 +96,23 @@ class FlightSerializer(serializers.ModelSerializer):
         fields = ("id", "route", "airplane", "departure_time", "arrival_time", "crew")
 
 
+def load_seats_held(flights) -> None:
+    """Set seats_held on flights with a single hold store lookup"""
+    flights = list(flights)
+    held = holds.get_hold_store().held_counts({flight.id for flight in flights})
+    for flight in flights:
+        flight.seats_held = held[flight.id]
+
+
+class FlightAvailabilityListSerializer(serializers.ListSerializer):
+    """Loads the number of seats held for checkout for the whole page"""
+
+    def to_representation(self, data):
+        flights = list(data.all() if isinstance(data, BaseManager) else data)
+        load_seats_held(flights)
+        return super().to_representation(flights)
+
+
 class FlightListSerializer(FlightSerializer):
     route = serializers.StringRelatedField()
     airplane = serializers.CharField(source="airplane.name")
@@ -72,6 +132,55 @@ class FlightListSerializer(FlightSerializer):
             "airplane_capacity",
             "tickets_available",
         )
+        list_serializer_class = FlightAvailabilityListSerializer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "tickets_available" in data:
+            data["tickets_available"] -= getattr(instance, "seats_held", 0)
+        return data
+
+
+class FlightValuesListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rows = list(data)
+        held = holds.get_hold_store().held_counts({row["id"] for row in rows})
+        for row in rows:
+            row["seats_held"] = held[row["id"]]
+        return super().to_representation(rows)
+
+
+class FlightListValuesSerializer(ValuesSerializer):
+    """FlightListSerializer output, the queryset has with_tickets_available()"""
+
+    class Meta:
+        list_serializer_class = FlightValuesListSerializer
+
+    @staticmethod
+    def values(queryset):
+        return queryset.prefetch_related(None).values(
+            "id",
+            "departure_time",
+            "arrival_time",
+            "tickets_available",
+            source_name=F("route__source__name"),
+            destination_name=F("route__destination__name"),
+            airplane_name=F("airplane__name"),
+            airplane_rows=F("airplane__rows"),
+            airplane_seats_in_row=F("airplane__seats_in_row"),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            # str(route)
+            "route": f"{row['source_name']}-{row['destination_name']}",
+            "airplane": row["airplane_name"],
+            "departure_time": self.datetime(row["departure_time"]),
+            "arrival_time": self.datetime(row["arrival_time"]),
+            "airplane_capacity": row["airplane_rows"] * row["airplane_seats_in_row"],
+            "tickets_available": row["tickets_available"] - row.get("seats_held", 0),
+        }
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -94,6 +203,55 @@ class TicketListSerializer(TicketSerializer):
     flight = FlightListSerializer(many=False, read_only=True)
 
 
+class PreloadedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolves flights from a batch loaded up front instead of one by one"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.preloaded = {}
+
+    @staticmethod
+    def to_pk(value):
+        return models.Flight._meta.pk.to_python(value)
+
+    def preload(self, values):
+        pks = set()
+        for value in values:
+            try:
+                pks.add(self.to_pk(value))
+            except (DjangoValidationError, TypeError):
+                continue
+        self.preloaded = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        try:
+            return self.preloaded[self.to_pk(data)]
+        except (KeyError, DjangoValidationError, TypeError):
+            return super().to_internal_value(data)
+
+
+class TicketBatchListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.fields["flight"].preload(
+                item.get("flight") for item in data if isinstance(item, dict)
+            )
+        return super().to_internal_value(data)
+
+
+class OrderTicketSerializer(TicketSerializer):
+    flight = PreloadedFlightField(
+        queryset=models.Flight.objects.select_related("airplane")
+    )
+
+    class Meta:
+        model = models.Ticket
+        fields = ("id", "row", "seat", "flight")
+        # seat collisions are checked for the whole order by booking.book_tickets
+        validators = []
+        list_serializer_class = TicketBatchListSerializer
+
+
 class TicketSeatsSerializer(TicketSerializer):
     class Meta:
         model = models.Ticket
@@ -124,7 +282,8 @@ class FlightDetailSerializer(FlightSerializer):
     route = RouteListSerializer()
     airplane = AirplaneSerializer()
     crew = CrewShortSerializer(many=True)
-    taken_places = TicketSeatsSerializer(source="tickets", many=True, read_only=True)
+    taken_places = serializers.SerializerMethodField()
+    held_places = serializers.SerializerMethodField()
 
     class Meta:
         model = models.Flight
@@ -136,7 +295,153 @@ class FlightDetailSerializer(FlightSerializer):
             "arrival_time",
             "crew",
             "taken_places",
+            "held_places",
+        )
+
+    @extend_schema_field(TicketSeatsSerializer(many=True))
+    def get_taken_places(self, flight):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in seat_map.get_seat_map(flight).taken_seats()
+        ]
+
+    @extend_schema_field(TicketSeatsSerializer(many=True))
+    def get_held_places(self, flight):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in sorted(holds.get_hold_store().held_seats(flight.id))
+        ]
+
+
+class FlightAvailabilitySerializer(serializers.Serializer):
+    """Seats of a flight annotated with tickets_available"""
+
+    id = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    tickets_available = serializers.IntegerField()
+    taken_places = TicketSeatsSerializer(many=True)
+    held_places = TicketSeatsSerializer(many=True)
+
+    def to_representation(self, flight):
+        held = sorted(holds.get_hold_store().held_seats(flight.id))
+        return {
+            "id": flight.id,
+            "capacity": flight.airplane.capacity,
+            "tickets_available": flight.tickets_available - len(held),
+            "taken_places": [
+                {"row": row, "seat": seat}
+                for row, seat in seat_map.get_seat_map(flight).taken_seats()
+            ],
+            "held_places": [{"row": row, "seat": seat} for row, seat in held],
+        }
+
+
+class SeatMapQuerySerializer(serializers.Serializer):
+    encoding = serializers.ChoiceField(
+        choices=["bitmap", "rle"],
+        default="bitmap",
+        help_text=(
+            "bitmap: base64 of one bit per seat, row by row, high bit first; "
+            "rle: lengths of alternating free and taken runs, free first"
+        ),
+    )
+    by_row = serializers.BooleanField(
+        default=False, help_text="Add the number of free seats in each row"
+    )
+
+
+class FlightSeatMapSerializer(serializers.Serializer):
+    """
+    Taken and held seats of a flight as compact seat maps of
+    rows * seats_in_row seats, encoded as asked in context["encoding"]
+    """
+
+    id = serializers.IntegerField()
+    rows = serializers.IntegerField()
+    seats_in_row = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    taken = serializers.IntegerField()
+    held = serializers.IntegerField()
+    available = serializers.IntegerField()
+    encoding = serializers.CharField()
+    taken_seats = serializers.JSONField()
+    held_seats = serializers.JSONField()
+    available_by_row = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    def to_representation(self, flight):
+        taken = seat_map.get_seat_map(flight)
+        held = seat_map.SeatMap.for_airplane(
+            flight.airplane, holds.get_hold_store().held_seats(flight.id)
         )
+        occupied = taken | held
+        encode = "encode" if self.context["encoding"] == "bitmap" else "runs"
+        data = {
+            "id": flight.id,
+            "rows": taken.rows,
+            "seats_in_row": taken.seats_in_row,
+            "capacity": taken.capacity,
+            "taken": taken.taken,
+            "held": held.taken,
+            "available": occupied.available,
+            "encoding": self.context["encoding"],
+            "taken_seats": getattr(taken, encode)(),
+            "held_seats": getattr(held, encode)(),
+        }
+        if self.context["by_row"]:
+            data["available_by_row"] = occupied.available_by_row()
+        return data
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    start = serializers.DateField(
+        default=timezone.localdate, help_text="First day, today by default"
+    )
+    days = serializers.IntegerField(
+        min_value=1, max_value=availability.MAX_CALENDAR_DAYS, default=31
+    )
+
+
+class DailyAvailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.DailyAvailability
+        fields = (
+            "day",
+            "flights",
+            "capacity",
+            "seats_available",
+            "min_seats_available",
+        )
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate_seats(self, seats):
+        airplane = self.context["flight"].airplane
+        for seat in seats:
+            models.Ticket.validate_ticket(
+                seat["row"], seat["seat"], airplane, exceptions.ValidationError
+            )
+        if len({(seat["row"], seat["seat"]) for seat in seats}) != len(seats):
+            raise exceptions.ValidationError("each seat can be held only once")
+        return seats
+
+    def create(self, validated_data):
+        expires_at = booking.hold_seats(
+            self.context["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+            self.context["request"].user.id,
+        )
+        return {"seats": validated_data["seats"], "expires_at": expires_at}
 
 
 class CrewDetailSerializer(CrewSerializer):
@@ -154,20 +459,93 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = OrderTicketSerializer(many=True, read_only=False, allow_empty=False)
 
     class Meta:
         model = models.Order
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = models.Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                models.Ticket.objects.create(order=order, **ticket_data)
-            return order
+        tickets_data = validated_data.pop("tickets")
+        return booking.place_order(tickets_data, **validated_data)
+
+
+class OrderHistoryListSerializer(serializers.ListSerializer):
+    """Loads the seats held on the flights of the whole page at once"""
+
+    def to_representation(self, data):
+        orders = list(data.all() if isinstance(data, BaseManager) else data)
+        load_seats_held(
+            ticket.flight for order in orders for ticket in order.tickets.all()
+        )
+        return super().to_representation(orders)
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = models.Order
+        fields = ("id", "tickets", "created_at")
+        list_serializer_class = OrderHistoryListSerializer
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.PrimaryKeyRelatedField(queryset=models.Airport.objects.all())
+    destination = serializers.PrimaryKeyRelatedField(
+        queryset=models.Airport.objects.all()
+    )
+    departure_after = serializers.DateTimeField(required=False)
+    departure_before = serializers.DateTimeField(required=False)
+    passengers = serializers.IntegerField(min_value=1, default=1)
+    max_legs = serializers.IntegerField(
+        min_value=1, max_value=4, default=itineraries.MAX_LEGS
+    )
+    min_connection = serializers.IntegerField(
+        min_value=0,
+        default=itineraries.MIN_CONNECTION.seconds // 60,
+        help_text="Minimum connection time in minutes",
+    )
+    max_connection = serializers.IntegerField(
+        min_value=1,
+        default=itineraries.MAX_CONNECTION.days * 24 * 60,
+        help_text="Maximum connection time in minutes",
+    )
+    sort = serializers.ChoiceField(choices=itineraries.SORT_KEYS, default="duration")
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=5)
+
+    def validate(self, attrs):
+        if attrs["source"] == attrs["destination"]:
+            raise exceptions.ValidationError(
+                {"destination": "destination must differ from source"}
+            )
+        attrs.setdefault("departure_after", timezone.now())
+        attrs.setdefault(
+            "departure_before", attrs["departure_after"] + timedelta(days=1)
+        )
+        if attrs["departure_before"] < attrs["departure_after"]:
+            raise exceptions.ValidationError(
+                {"departure_before": "departure_before must be after departure_after"}
+            )
+        if attrs["min_connection"] > attrs["max_connection"]:
+            raise exceptions.ValidationError(
+                {"max_connection": "max_connection must not be below min_connection"}
+            )
+        attrs["min_connection"] = timedelta(minutes=attrs["min_connection"])
+        attrs["max_connection"] = timedelta(minutes=attrs["max_connection"])
+        return attrs
+
+
+class ItineraryLegSerializer(FlightListSerializer):
+    class Meta(FlightListSerializer.Meta):
+        # find_itineraries has loaded the legs' seats_held already
+        list_serializer_class = serializers.ListSerializer
+
+
+class ItinerarySerializer(serializers.Serializer):
+    legs = ItineraryLegSerializer(many=True)
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    duration = serializers.DurationField()
+    distance = serializers.IntegerField()
+    connections = serializers.IntegerField()
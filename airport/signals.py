@@ -0,0 +1,153 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from airport import availability, caching, itineraries, models, seat_map
+
+
+@receiver(post_save, sender=models.Ticket)
+def mark_seat_taken(sender, instance, created, **kwargs):
+    if created:
+        models.Flight.add_tickets_sold(instance.flight_id, 1)
+        availability.flights_changed([instance.flight_id])
+        transaction.on_commit(
+            lambda: seat_map.update_seat_map(
+                instance.flight_id, [(instance.row, instance.seat)]
+            )
+        )
+
+
+@receiver(post_delete, sender=models.Ticket)
+def mark_seat_free(sender, instance, origin=None, **kwargs):
+    if origin is instance or origin is None:
+        models.Flight.add_tickets_sold(instance.flight_id, -1)
+        availability.flights_changed([instance.flight_id])
+        transaction.on_commit(
+            lambda: seat_map.update_seat_map(
+                instance.flight_id, [(instance.row, instance.seat)], taken=False
+            )
+        )
+        return
+
+    deleted = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if deleted is models.Flight:
+        # the flight and its seat map go away with its tickets
+        return
+    # an order, route or airplane delete or a bulk one removes all of its
+    # tickets before this is sent for each, so every flight is recounted
+    # once, and refreshed once after commit
+    flight_ids = getattr(origin, "_freed_flights", None)
+    if flight_ids is None:
+        flight_ids = origin._freed_flights = set()
+        transaction.on_commit(lambda: flights_freed(flight_ids))
+    if instance.flight_id not in flight_ids:
+        flight_ids.add(instance.flight_id)
+        models.Flight.recount_tickets_sold(instance.flight_id)
+
+
+def flights_freed(flight_ids) -> None:
+    availability.refresh_flights(flight_ids)
+    for flight_id in flight_ids:
+        seat_map.forget_seat_map(flight_id)
+
+
+@receiver(post_save, sender=models.Flight)
+@receiver(post_delete, sender=models.Flight)
+def reset_seat_map(sender, instance, **kwargs):
+    transaction.on_commit(lambda: seat_map.forget_seat_map(instance.id))
+
+
+@receiver(pre_save, sender=models.Flight)
+def remember_flight_day(sender, instance, **kwargs):
+    # a moved flight leaves the day it was on
+    instance._previous_day = None
+    if instance.pk is not None:
+        previous = (
+            models.Flight.objects.filter(pk=instance.pk)
+            .values_list("route_id", "departure_time")
+            .first()
+        )
+        if previous is not None:
+            route_id, departure_time = previous
+            instance._previous_day = (route_id, availability.flight_day(departure_time))
+
+
+@receiver(post_save, sender=models.Flight)
+@receiver(post_delete, sender=models.Flight)
+def refresh_flight_days(sender, instance, **kwargs):
+    days = [(instance.route_id, availability.flight_day(instance.departure_time))]
+    if getattr(instance, "_previous_day", None):
+        days.append(instance._previous_day)
+    availability.days_changed(days)
+
+
+@receiver(post_save, sender=models.Airplane)
+def refresh_airplane_days(sender, instance, created, **kwargs):
+    if not created:
+        availability.flights_changed(
+            models.Flight.objects.filter(airplane=instance).values_list("pk", flat=True)
+        )
+
+
+@receiver(post_save, sender=models.Route)
+def update_indexed_route(sender, instance, **kwargs):
+    values = (
+        instance.id,
+        instance.source_id,
+        instance.destination_id,
+        instance.distance,
+    )
+    transaction.on_commit(lambda: itineraries.route_changed(*values))
+
+
+@receiver(post_delete, sender=models.Route)
+def remove_indexed_route(sender, instance, **kwargs):
+    route_id = instance.id
+    transaction.on_commit(lambda: itineraries.route_changed(route_id))
+
+
+@receiver(post_save, sender=models.Flight)
+def update_indexed_flight(sender, instance, **kwargs):
+    values = (
+        instance.id,
+        instance.route_id,
+        instance.departure_time,
+        instance.arrival_time,
+    )
+    transaction.on_commit(lambda: itineraries.flight_changed(*values))
+
+
+@receiver(post_delete, sender=models.Flight)
+def remove_indexed_flight(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: itineraries.flight_changed(flight_id))
+
+
+REFERENCE_MODELS = (
+    models.Airport,
+    models.AirplaneType,
+    models.Airplane,
+    models.Route,
+    models.Crew,
+    models.Flight,
+)
+
+
+def invalidate_cached_responses(model) -> None:
+    # bump now for this transaction and again once the change is visible
+    # to others, so no response built from old rows outlives the commit
+    caching.bump_version(model)
+    transaction.on_commit(lambda: caching.bump_version(model))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def reference_data_changed(sender, **kwargs):
+    if sender in REFERENCE_MODELS:
+        invalidate_cached_responses(sender)
+
+
+@receiver(m2m_changed, sender=models.Flight.crew.through)
+def flight_crew_changed(sender, **kwargs):
+    invalidate_cached_responses(models.Flight)
@@ -1,9 +1,24 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from airport.models import Airport, Route, Crew, AirplaneType, Airplane, Flight, Order
+
+from airport import holds
+from airport.serializers import FlightListSerializer, RouteListSerializer
+from airport.models import (
+    Airport,
+    Route,
+    Crew,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Order,
+    Ticket,
+)
 
 AIRPORT_URL = reverse("airport:airport-list")
 ROUTE_URL = reverse("airport:route-list")
@@ -66,7 +81,8 @@ def sample_flight(route=None, airplane=None, **params):
 
 
 class BaseTestData(TestCase):
-    def setUpTestData(self):
+    def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.superuser = get_user_model().objects.create_superuser(
             "superuser@myproject.com", "password"
@@ -114,6 +130,16 @@ class RouteViewSetTests(BaseTestData):
         self.assertEqual(Route.objects.count(), 1)
         self.assertEqual(Route.objects.get().distance, 500)
 
+    def test_list_routes_matches_route_list_serializer(self):
+        sample_route()
+        sample_route(distance=100)
+        res = self.client.get(ROUTE_URL)
+
+        routes = Route.objects.select_related("source", "destination")
+        self.assertEqual(
+            res.data["results"], RouteListSerializer(routes, many=True).data
+        )
+
 
 class FlightViewSetTests(BaseTestData):
     def test_list_flights(self):
@@ -139,6 +165,25 @@ class FlightViewSetTests(BaseTestData):
         self.assertEqual(Flight.objects.count(), 1)
         self.assertEqual(Flight.objects.get().route, route)
 
+    def test_list_flights_matches_flight_list_serializer(self):
+        flight = sample_flight()
+        sample_flight(route=flight.route, airplane=flight.airplane)
+        Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=Order.objects.create(user=self.user)
+        )
+        holds.get_hold_store().hold(flight.id, [(2, 2)], self.user.id)
+        self.addCleanup(holds.get_hold_store().release, flight.id, self.user.id)
+
+        flights = Flight.objects.with_tickets_available()
+        expected = FlightListSerializer(flights, many=True).data
+        for pagination in ("offset", "cursor"):
+            with self.subTest(pagination):
+                res = self.client.get(FLIGHT_URL, {"pagination": pagination})
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res.data["results"], expected)
+        self.assertEqual(expected[0]["tickets_available"], 60 - 2)
+
 
 class OrderViewSetTests(BaseTestData):
     def setUp(self):
@@ -153,6 +198,45 @@ class OrderViewSetTests(BaseTestData):
         self.assertEqual(len(res.data["results"]), 1)
         self.assertEqual(res.data["results"][0]["id"], order.id)
 
+    def test_list_orders_with_flight_availability(self):
+        flight = sample_flight()
+        other_flight = sample_flight(route=flight.route, airplane=flight.airplane)
+
+        def list_orders():
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(ORDER_URL, {"limit": 100})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return res, len(queries)
+
+        def add_orders(count):
+            for _ in range(count):
+                order = Order.objects.create(user=self.user)
+                for booked in (flight, other_flight):
+                    number = booked.tickets.count()
+                    Ticket.objects.create(
+                        row=number // 6 + 1,
+                        seat=number % 6 + 1,
+                        flight=booked,
+                        order=order,
+                    )
+
+        add_orders(1)
+        _, queries = list_orders()
+        add_orders(19)
+        holds.get_hold_store().hold(flight.id, [(10, 6)], self.superuser.id)
+        self.addCleanup(holds.get_hold_store().release, flight.id, self.superuser.id)
+        res, more_queries = list_orders()
+
+        self.assertEqual(more_queries, queries)
+        tickets = res.data["results"][0]["tickets"]
+        self.assertEqual(
+            {
+                ticket["flight"]["id"]: ticket["flight"]["tickets_available"]
+                for ticket in tickets
+            },
+            {flight.id: 60 - 20 - 1, other_flight.id: 60 - 20},
+        )
+
     def test_create_order(self):
         flight = sample_flight()
         payload = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
@@ -161,3 +245,77 @@ class OrderViewSetTests(BaseTestData):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Order.objects.count(), 1)
         self.assertEqual(Order.objects.get().tickets.count(), 1)
+
+    def test_create_order_with_many_tickets(self):
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": flight.id} for seat in range(1, 7)
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 6)
+
+    def test_create_order_query_count_does_not_depend_on_tickets(self):
+        flight = sample_flight()
+
+        def post_order(row, seats):
+            payload = {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id} for seat in seats
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(ORDER_URL, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(post_order(1, [1]), post_order(2, range(1, 7)))
+
+    def test_create_order_taken_seat(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 2, "flight": flight.id},
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"], [{"flight": flight.id, "row": 1, "seat": 1}]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_order_duplicate_seat(self):
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 1, "flight": flight.id},
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_create_order_seat_out_of_range(self):
+        flight = sample_flight()
+        payload = {"tickets": [{"row": 11, "seat": 1, "flight": flight.id}]}
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+
+    def test_create_order_unknown_flight(self):
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": 999}]}
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
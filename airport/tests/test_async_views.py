@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport import holds
+from airport.models import Order, Ticket
+from airport.tests.test_api import FLIGHT_URL, sample_flight
+
+
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+
+
+class AsyncFlightViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.other_flight = sample_flight(
+            route=self.flight.route, airplane=self.flight.airplane
+        )
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+        holds.get_hold_store().hold(self.flight.id, [(2, 2)], self.user.id)
+        self.addCleanup(holds.get_hold_store().release, self.flight.id, self.user.id)
+
+    def test_list_matches_sync_list(self):
+        for params in ({}, {"limit": 1, "offset": 1}, {"route": self.flight.route_id}):
+            with self.subTest(params=params):
+                sync_res = self.client.get(FLIGHT_URL, params)
+                async_res = self.client.get(ASYNC_FLIGHT_URL, params)
+
+                self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+                self.assertEqual(async_res.data["count"], sync_res.data["count"])
+                self.assertEqual(async_res.data["results"], sync_res.data["results"])
+
+    def test_detail_and_availability_match_sync_views(self):
+        for name in ("flight-detail", "flight-availability"):
+            with self.subTest(name):
+                url = reverse(f"airport:{name}", args=[self.flight.id])
+                async_url = reverse(f"airport:async-{name}", args=[self.flight.id])
+
+                sync_res = self.client.get(url)
+                async_res = self.client.get(async_url)
+
+                self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+                self.assertEqual(async_res.data, sync_res.data)
+
+        self.assertEqual(
+            async_res.data,
+            {
+                "id": self.flight.id,
+                "capacity": 60,
+                "tickets_available": 58,
+                "taken_places": [{"row": 1, "seat": 1}],
+                "held_places": [{"row": 2, "seat": 2}],
+            },
+        )
+
+    def test_authenticates_with_jwt(self):
+        client = APIClient()
+        url = reverse("airport:async-flight-detail", args=[self.flight.id])
+
+        anonymous = client.get(url)
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        authenticated = client.get(url)
+
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(authenticated.status_code, status.HTTP_200_OK)
+
+    def test_errors(self):
+        missing = self.client.get(
+            reverse("airport:async-flight-detail", args=[self.flight.id + 100])
+        )
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@myproject.com", "pass")
+        )
+        not_allowed = self.client.post(ASYNC_FLIGHT_URL, {})
+
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(not_allowed.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,160 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import DailyAvailability, Flight, Order, Ticket
+from airport.tests.test_api import (
+    ORDER_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+
+CALENDAR_URL = reverse("airport:flight-calendar")
+
+
+class DailyAvailabilityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.small_airplane = sample_airplane(rows=2, seats_in_row=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.morning = sample_flight(route=self.route)
+            self.evening = sample_flight(
+                route=self.route,
+                airplane=self.small_airplane,
+                departure_time="2024-08-12T18:00:00Z",
+                arrival_time="2024-08-12T20:00:00Z",
+            )
+            self.next_day = sample_flight(
+                route=self.route,
+                airplane=self.morning.airplane,
+                departure_time="2024-08-13T10:00:00Z",
+                arrival_time="2024-08-13T12:00:00Z",
+            )
+
+    def days(self):
+        return {
+            row["day"].isoformat(): (
+                row["flights"],
+                row["capacity"],
+                row["seats_available"],
+                row["min_seats_available"],
+            )
+            for row in DailyAvailability.objects.filter(route=self.route).values()
+        }
+
+    def test_flights_are_counted_per_day(self):
+        self.assertEqual(
+            self.days(),
+            {"2024-08-12": (2, 64, 64, 4), "2024-08-13": (1, 60, 60, 60)},
+        )
+
+    def test_orders_update_seats(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": self.evening.id} for seat in (1, 2)
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.days()["2024-08-12"], (2, 64, 62, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evening.tickets.first().delete()
+        self.assertEqual(self.days()["2024-08-12"], (2, 64, 63, 3))
+
+    def test_moved_and_deleted_flights_leave_their_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.next_day.departure_time = "2024-08-14T10:00:00Z"
+            self.next_day.arrival_time = "2024-08-14T12:00:00Z"
+            self.next_day.save()
+            self.evening.delete()
+
+        self.assertEqual(
+            self.days(),
+            {"2024-08-12": (1, 60, 60, 60), "2024-08-14": (1, 60, 60, 60)},
+        )
+
+    def test_airplane_change_updates_capacity(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.small_airplane.rows = 3
+            self.small_airplane.save()
+
+        self.assertEqual(self.days()["2024-08-12"], (2, 66, 66, 6))
+
+    def test_airplane_smaller_than_tickets_sold(self):
+        order = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for row, seat in ((1, 1), (2, 1), (2, 2)):
+                Ticket.objects.create(
+                    row=row, seat=seat, flight=self.evening, order=order
+                )
+            self.small_airplane.rows = 1
+            self.small_airplane.save()
+
+        self.assertEqual(self.days()["2024-08-12"], (2, 62, 60, 0))
+
+    def test_rebuild_command(self):
+        DailyAvailability.objects.all().delete()
+        Flight.objects.filter(pk=self.morning.pk).update(tickets_sold=10)
+
+        call_command("rebuild_daily_availability", stdout=StringIO())
+
+        self.assertEqual(
+            self.days(),
+            {"2024-08-12": (2, 64, 54, 4), "2024-08-13": (1, 60, 60, 60)},
+        )
+
+    def test_calendar(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                CALENDAR_URL, {"route": self.route.id, "start": "2024-08-01"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "day": "2024-08-12",
+                    "flights": 2,
+                    "capacity": 64,
+                    "seats_available": 64,
+                    "min_seats_available": 4,
+                },
+                {
+                    "day": "2024-08-13",
+                    "flights": 1,
+                    "capacity": 60,
+                    "seats_available": 60,
+                    "min_seats_available": 60,
+                },
+            ],
+        )
+
+    def test_calendar_range(self):
+        one_day = self.client.get(
+            CALENDAR_URL, {"route": self.route.id, "start": "2024-08-13", "days": 1}
+        )
+        too_long = self.client.get(CALENDAR_URL, {"route": self.route.id, "days": 1000})
+        no_route = self.client.get(CALENDAR_URL)
+
+        self.assertEqual([day["day"] for day in one_day.data], ["2024-08-13"])
+        self.assertEqual(too_long.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(no_route.status_code, status.HTTP_400_BAD_REQUEST)
+        # start defaults to today, long after these flights
+        self.assertEqual(
+            self.client.get(CALENDAR_URL, {"route": self.route.id}).data, []
+        )
@@ -0,0 +1,144 @@
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from airport.benchmarks.api import run_benchmarks
+from airport.benchmarks.concurrency import (
+    benchmark_tokens,
+    compare_connection_reuse,
+    compare_in_process,
+    endpoints,
+)
+from airport.benchmarks.passwords import compare_hashers
+from airport.benchmarks.profiles import measure_startup
+from airport.benchmarks.query_plans import check_query_plans
+from airport.benchmarks.seed import SCALES, seed, seeded_ids
+from airport.benchmarks.serializers import (
+    compare_list_serializers,
+    compare_renderers,
+)
+from airport.models import Flight, Ticket
+
+
+class SeedTest(TestCase):
+    def test_seed_is_consistent(self):
+        ids = seed(SCALES["tiny"])
+
+        self.assertEqual(len(ids["flights"]), SCALES["tiny"].flights)
+        self.assertEqual(Ticket.objects.count(), SCALES["tiny"].tickets)
+        for flight in Flight.objects.all():
+            self.assertEqual(flight.tickets_sold, flight.tickets.count())
+
+    def test_seeded_ids_match_seed(self):
+        ids = seed(SCALES["tiny"])
+
+        self.assertEqual(seeded_ids(), ids)
+
+
+class QueryPlanTest(TestCase):
+    def test_hot_queries_use_indexes(self):
+        ids = seed(SCALES["tiny"])
+
+        checks = check_query_plans(
+            route_id=ids["routes"][0],
+            user_id=ids["users"][0],
+            flight_id=ids["flights"][0],
+        )
+
+        for check in checks:
+            self.assertTrue(check.ok, f"{check.name}: {check.plan}")
+
+
+class ApiBenchmarkTest(TestCase):
+    def test_scenarios_report_latency_queries_and_memory(self):
+        ids = seed(SCALES["tiny"])
+
+        results = run_benchmarks(ids, iterations=3, warmup=1)
+
+        self.assertEqual(
+            list(results),
+            [
+                "flight list",
+                "flight list, cursor page",
+                "flight detail",
+                "order create",
+                "order list",
+            ],
+        )
+        for result in results.values():
+            self.assertEqual(result["iterations"], 3)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+        self.assertEqual(Ticket.objects.count(), SCALES["tiny"].tickets + 5)
+
+
+class SerializerBenchmarkTest(TestCase):
+    def test_values_serializers_render_the_same_json(self):
+        seed(SCALES["tiny"])
+
+        results = compare_list_serializers(rows=50, repeat=1)
+
+        self.assertEqual(list(results), ["flights", "routes"])
+        for result in results.values():
+            self.assertTrue(result["identical"])
+            self.assertGreater(result["rows"], 0)
+
+    def test_fast_renderer_renders_the_same_bytes(self):
+        seed(SCALES["tiny"])
+
+        results = compare_renderers(rows=50, repeat=1)
+
+        self.assertEqual(list(results), ["flight list", "flight detail"])
+        for result in results.values():
+            self.assertTrue(result["identical"])
+
+
+class ConcurrencyBenchmarkTest(TransactionTestCase):
+    # the load runs in other threads, which only see committed rows
+    def test_wsgi_and_asgi_paths_serve_the_load(self):
+        ids = seed(SCALES["tiny"])
+
+        results = compare_in_process(endpoints(ids["flights"]), benchmark_tokens(2), 4)
+
+        self.assertEqual(
+            list(results), ["flight list", "flight detail", "seat availability"]
+        )
+        for result in results.values():
+            for path in ("wsgi", "asgi"):
+                self.assertEqual(result[path]["requests"], 4)
+                self.assertEqual(result[path]["errors"], 0)
+
+    def test_connection_reuse_counts_opened_connections(self):
+        ids = seed(SCALES["tiny"])
+        path = endpoints(ids["flights"])["flight detail"][0]
+
+        results = compare_connection_reuse(path, benchmark_tokens(2), 4)
+
+        self.assertEqual(list(results), ["CONN_MAX_AGE=0", "CONN_MAX_AGE=60"])
+        for result in results.values():
+            self.assertEqual(result["errors"], 0)
+            self.assertLessEqual(result["connections_opened"], 4)
+
+
+class PasswordBenchmarkTest(TestCase):
+    def test_hashers_register_users_and_rehash_on_login(self):
+        results = compare_hashers(["scrypt", "pbkdf2"], users=2)
+
+        for name, result in results["hashers"].items():
+            with self.subTest(name):
+                self.assertGreater(result["registrations_per_second"], 0)
+                self.assertGreater(result["token_obtain"]["p50_ms"], 0)
+        self.assertEqual(
+            results["hashers"]["scrypt"]["rehash_from_pbkdf2"]["stored_algorithm"],
+            "scrypt",
+        )
+        self.assertGreater(results["common_passwords"]["word_list_load_ms"], 0)
+
+
+class ProfileBenchmarkTest(SimpleTestCase):
+    def test_only_dev_profile_loads_debug_toolbar(self):
+        for profile, loaded in (("dev", True), ("prod", False)):
+            with self.subTest(profile):
+                result = measure_startup(profile, runs=1)
+
+                self.assertEqual(result["debug_toolbar_loaded"], loaded)
+                self.assertGreater(result["startup_ms"], 0)
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests.test_api import (
+    AIRPORT_URL,
+    CREW_URL,
+    ROUTE_URL,
+    sample_airport,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+
+class CachedListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@myproject.com")
+        )
+
+    def test_repeated_list_is_served_from_cache(self):
+        sample_airport()
+        first = self.client.get(AIRPORT_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_query_params_are_part_of_the_key(self):
+        sample_airport(name="Boryspil")
+        sample_airport(name="Zhuliany")
+        self.client.get(AIRPORT_URL)
+
+        res = self.client.get(AIRPORT_URL, {"search": "Bory"})
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_if_none_match_returns_not_modified(self):
+        sample_airport()
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_save_invalidates_list(self):
+        sample_airport()
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        sample_airport(name="Another Airport")
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_route_list_follows_airport_changes(self):
+        route = sample_route()
+        self.client.get(ROUTE_URL)
+
+        route.source.name = "Renamed Airport"
+        route.source.save()
+        res = self.client.get(ROUTE_URL)
+
+        self.assertEqual(res.data["results"][0]["source"], "Renamed Airport")
+
+    def test_crew_list_follows_flight_crew_changes(self):
+        crew = sample_crew()
+        flight = sample_flight()
+        self.client.get(CREW_URL)
+
+        flight.crew.add(crew)
+        res = self.client.get(CREW_URL)
+
+        self.assertEqual(res.data["results"][0]["flights"], [str(flight)])
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport import exports, holds
+from airport.models import Order, Ticket
+from airport.tests.test_api import (
+    FLIGHT_URL,
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+
+FLIGHT_EXPORT_URL = reverse("airport:flight-export")
+ORDER_EXPORT_URL = reverse("airport:order-export")
+
+
+def streamed(res) -> str:
+    return b"".join(res.streaming_content).decode()
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+        self.route = sample_route(
+            sample_airport(name="Boryspil"), sample_airport(name="Heathrow")
+        )
+        self.flights = [
+            sample_flight(
+                route=self.route,
+                airplane=self.airplane,
+                departure_time=f"2024-08-{day}T10:00:00Z",
+                arrival_time=f"2024-08-{day}T12:00:00Z",
+            )
+            for day in range(10, 15)
+        ]
+
+    def test_export_flights_as_ndjson(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHT_EXPORT_URL)
+            rows = [json.loads(line) for line in streamed(res).splitlines()]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson; charset=utf-8")
+        self.assertEqual([row["id"] for row in rows], [f.id for f in self.flights])
+        self.assertEqual(list(rows[0]), list(exports.FLIGHT_FIELDS))
+        self.assertEqual(rows[0]["source"], "Boryspil")
+        self.assertEqual(rows[0]["departure_time"], "2024-08-10T10:00:00Z")
+        self.assertEqual(rows[0]["tickets_available"], 60)
+
+    def test_export_flights_counts_held_seats(self):
+        holds.get_hold_store().hold(self.flights[0].id, [(1, 1), (1, 2)], self.user.id)
+        self.addCleanup(
+            holds.get_hold_store().release, self.flights[0].id, self.user.id
+        )
+
+        res = self.client.get(FLIGHT_EXPORT_URL)
+        rows = [json.loads(line) for line in streamed(res).splitlines()]
+
+        listed = self.client.get(FLIGHT_URL, {"route": self.route.id}).data
+        self.assertEqual(
+            [row["tickets_available"] for row in rows],
+            [flight["tickets_available"] for flight in listed["results"]],
+        )
+        self.assertEqual(rows[0]["tickets_available"], 58)
+
+    async def test_export_streams_under_asgi(self):
+        token = AccessToken.for_user(self.user)
+
+        res = await AsyncClient().get(
+            FLIGHT_EXPORT_URL, headers={"authorization": f"Bearer {token}"}
+        )
+        content = b"".join([chunk async for chunk in res.streaming_content])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in content.decode().splitlines()],
+            [flight.id for flight in self.flights],
+        )
+
+    def test_export_flights_as_csv_honours_filters(self):
+        res = self.client.get(
+            FLIGHT_EXPORT_URL,
+            {"format": "csv", "departure_time_after": "2024-08-13T00:00:00Z"},
+        )
+
+        rows = list(csv.DictReader(io.StringIO(streamed(res))))
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="flights.csv"', res["Content-Disposition"])
+        self.assertEqual(
+            [int(row["id"]) for row in rows], [f.id for f in self.flights[3:]]
+        )
+        self.assertEqual(rows[0]["destination"], "Heathrow")
+
+    def test_export_orders_is_admin_only(self):
+        res = self.client.get(ORDER_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_orders_of_all_users(self):
+        admin = get_user_model().objects.create_superuser("admin@myproject.com", "x")
+        for user, flight in ((self.user, self.flights[0]), (admin, self.flights[1])):
+            order = Order.objects.create(user=user)
+            Ticket.objects.create(order=order, flight=flight, row=1, seat=1)
+            Ticket.objects.create(order=order, flight=flight, row=1, seat=2)
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(ORDER_EXPORT_URL, {"format": "csv"})
+
+        rows = list(csv.DictReader(io.StringIO(streamed(res))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            [row["user"] for row in rows],
+            ["user@myproject.com"] * 2 + ["admin@myproject.com"] * 2,
+        )
+        self.assertEqual(list(rows[0]), list(exports.ORDER_FIELDS))
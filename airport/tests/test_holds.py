@@ -0,0 +1,210 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import booking, holds
+from airport.models import Ticket
+from airport.tests.test_api import FLIGHT_URL, ORDER_URL, sample_flight
+
+
+def hold_url(flight_id):
+    return reverse("airport:flight-hold", args=[flight_id])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class LocalHoldStoreTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = holds.LocalHoldStore(clock=self.clock)
+
+    def test_hold_and_conflict(self):
+        expires_at, conflicts = self.store.hold(1, [(1, 1), (1, 2)], owner=1, ttl=60)
+
+        self.assertEqual(expires_at, 1060.0)
+        self.assertEqual(conflicts, set())
+
+        _, conflicts = self.store.hold(1, [(1, 2), (1, 3)], owner=2, ttl=60)
+        self.assertEqual(conflicts, {(1, 2)})
+        self.assertEqual(self.store.held_seats(1), {(1, 1): "1", (1, 2): "1"})
+
+    def test_owner_can_extend_hold(self):
+        self.store.hold(1, [(1, 1)], owner=1, ttl=60)
+        self.clock.now += 50
+        self.store.hold(1, [(1, 1)], owner=1, ttl=60)
+        self.clock.now += 50
+
+        self.assertEqual(self.store.held_seats(1), {(1, 1): "1"})
+
+    def test_holds_expire(self):
+        self.store.hold(1, [(1, 1)], owner=1, ttl=60)
+        self.clock.now += 60
+
+        self.assertEqual(self.store.held_seats(1), {})
+        self.assertEqual(self.store.held_counts([1]), {1: 0})
+        _, conflicts = self.store.hold(1, [(1, 1)], owner=2, ttl=60)
+        self.assertEqual(conflicts, set())
+
+    def test_release(self):
+        self.store.hold(1, [(1, 1), (1, 2)], owner=1, ttl=60)
+        self.store.hold(1, [(2, 1)], owner=2, ttl=60)
+
+        self.assertEqual(self.store.release(1, owner=1, seats=[(1, 1)]), 1)
+        self.assertEqual(self.store.held_counts([1, 2]), {1: 2, 2: 0})
+        self.assertEqual(self.store.release(1, owner=1), 1)
+        self.assertEqual(self.store.held_seats(1), {(2, 1): "2"})
+
+
+class HoldStoreReleaseTest(TestCase):
+    def stores(self):
+        # the scripts answer as if no seat conflicted and two were released
+        redis = mock.Mock()
+        redis.register_script.side_effect = lambda script: mock.Mock(
+            return_value=[] if script == holds.RedisHoldStore.HOLD_SCRIPT else 2
+        )
+        return {
+            "local": holds.LocalHoldStore(),
+            "redis": holds.RedisHoldStore(redis),
+        }
+
+    def test_release_no_seats(self):
+        for name, store in self.stores().items():
+            with self.subTest(name):
+                store.hold(1, [(1, 1), (1, 2)], owner=1)
+
+                self.assertEqual(store.release(1, owner=1, seats=[]), 0)
+                self.assertEqual(store.release(1, owner=1), 2)
+
+    def test_release_script_arguments(self):
+        store = self.stores()["redis"]
+
+        store.release(1, owner=1, seats=[])
+        store.release(1, owner=1, seats=[(1, 2)])
+        store.release(1, owner=1)
+
+        self.assertEqual(
+            [call.kwargs["args"] for call in store._release.call_args_list],
+            [["1", "1:2"], ["1"]],
+        )
+
+
+class SeatHoldApiTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(holds, "_store", holds.LocalHoldStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flight = sample_flight()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.other_user = get_user_model().objects.create_user("other@myproject.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(self.other_user)
+
+    def hold(self, client, *seats):
+        return client.post(
+            hold_url(self.flight.id),
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def order(self, client, *seats):
+        return client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_hold_seats(self):
+        res = self.hold(self.client, (1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn("expires_at", res.data)
+        self.assertEqual(
+            holds.get_hold_store().held_seats(self.flight.id),
+            {(1, 1): str(self.user.id), (1, 2): str(self.user.id)},
+        )
+
+    def test_hold_seats_under_flight_lock(self):
+        store = holds.get_hold_store()
+        lock = booking._flight_locks[self.flight.id % booking.LOCK_POOL_SIZE]
+        locked = []
+
+        def hold(*args):
+            locked.append(lock.locked())
+            return store_hold(*args)
+
+        store_hold = store.hold
+        with mock.patch.object(store, "hold", hold):
+            res = self.hold(self.client, (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(locked, [True])
+
+    def test_hold_seat_held_by_other_user(self):
+        self.hold(self.other_client, (1, 1))
+
+        res = self.hold(self.client, (1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"], [{"flight": self.flight.id, "row": 1, "seat": 1}]
+        )
+
+    def test_hold_invalid_seat(self):
+        res = self.hold(self.client, (11, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_seat_held_by_other_user(self):
+        self.hold(self.other_client, (1, 1))
+
+        res = self.order(self.client, (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_order_own_held_seat_releases_hold(self):
+        self.hold(self.client, (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.order(self.client, (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(holds.get_hold_store().held_seats(self.flight.id), {})
+
+    def test_release_holds(self):
+        self.hold(self.client, (1, 1))
+
+        res = self.client.delete(hold_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(holds.get_hold_store().held_seats(self.flight.id), {})
+
+    def test_held_seats_reduce_availability(self):
+        self.hold(self.other_client, (1, 1), (1, 2))
+
+        res = self.client.get(FLIGHT_URL)
+        detail = self.client.get(
+            reverse("airport:flight-detail", args=[self.flight.id])
+        )
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 58)
+        self.assertEqual(
+            detail.data["held_places"], [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}]
+        )
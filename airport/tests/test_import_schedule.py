@@ -0,0 +1,139 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport import caching
+from airport.models import Flight
+from airport.tests.test_api import (
+    sample_airplane,
+    sample_airport,
+    sample_crew,
+    sample_route,
+)
+
+
+CSV_HEADER = "route,airplane,departure_time,arrival_time,crew\n"
+
+
+class ImportScheduleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.route = sample_route(
+            sample_airport(name="Boryspil"), sample_airport(name="Heathrow")
+        )
+        self.airplane = sample_airplane(name="Boeing 737")
+        self.pilot = sample_crew(first_name="Amelia", last_name="Earhart")
+        self.copilot = sample_crew(first_name="Charles", last_name="Lindbergh")
+
+    def write(self, name, content) -> str:
+        path = Path(self.directory.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def import_schedule(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_schedule", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv_with_names_and_ids(self):
+        path = self.write(
+            "schedule.csv",
+            CSV_HEADER + "Boryspil-Heathrow,Boeing 737,2025-06-01T10:00:00Z,"
+            "2025-06-01T13:00:00Z,Amelia Earhart;Charles Lindbergh\n"
+            f"{self.route.id},{self.airplane.id},2025-06-02T10:00:00,"
+            f"2025-06-02T13:00:00,{self.pilot.id}\n",
+        )
+
+        with self.assertNumQueries(7):
+            out, _ = self.import_schedule(path)
+
+        flights = Flight.objects.order_by("departure_time")
+        self.assertEqual(flights.count(), 2)
+        self.assertEqual(
+            sorted(flights[0].crew.values_list("id", flat=True)),
+            sorted([self.pilot.id, self.copilot.id]),
+        )
+        self.assertEqual(list(flights[1].crew.all()), [self.pilot])
+        self.assertEqual(flights[1].route, self.route)
+        self.assertIn("Imported 2 of 2 flights", out)
+
+    def test_import_json_lines_in_batches(self):
+        rows = [
+            {
+                "route": self.route.id,
+                "airplane": "Boeing 737",
+                "departure_time": f"2025-06-{day:02}T10:00:00Z",
+                "arrival_time": f"2025-06-{day:02}T12:00:00Z",
+                "crew": ["Amelia Earhart"],
+            }
+            for day in range(1, 26)
+        ]
+        path = self.write("schedule.jsonl", "\n".join(map(json.dumps, rows)))
+
+        self.import_schedule(path, "--batch-size", "10")
+
+        self.assertEqual(Flight.objects.count(), 25)
+        self.assertEqual(self.pilot.flights.count(), 25)
+
+    def test_invalid_rows_abort_the_import(self):
+        path = self.write(
+            "schedule.csv",
+            CSV_HEADER + f"{self.route.id},Boeing 737,2025-06-01T10:00:00Z,"
+            "2025-06-01T13:00:00Z,\n"
+            f"{self.route.id},Airbus,2025-06-01T10:00:00Z,2025-06-01T13:00:00Z,\n"
+            f"{self.route.id},Boeing 737,2025-06-01T13:00:00Z,"
+            "2025-06-01T10:00:00Z,\n",
+        )
+
+        with self.assertRaises(CommandError):
+            self.import_schedule(path)
+        self.assertEqual(Flight.objects.count(), 0)
+
+        out, err = self.import_schedule(path, "--skip-invalid")
+        self.assertEqual(Flight.objects.count(), 1)
+        self.assertIn("schedule.csv:3: unknown airplane 'Airbus'", err)
+        self.assertIn("schedule.csv:4: departure time", err)
+
+    def test_impossible_dates_are_invalid_rows(self):
+        path = self.write(
+            "schedule.csv",
+            CSV_HEADER + f"{self.route.id},Boeing 737,2026-02-30T10:00:00Z,"
+            "2026-03-01T13:00:00Z,\n"
+            f"{self.route.id},Boeing 737,2026-03-01T10:00:00Z,"
+            "2026-03-01T13:00:00Z,\n",
+        )
+
+        out, err = self.import_schedule(path, "--skip-invalid")
+
+        self.assertEqual(Flight.objects.count(), 1)
+        self.assertIn(
+            "schedule.csv:2: departure_time '2026-02-30T10:00:00Z' is not", err
+        )
+
+    def test_import_invalidates_cached_flights(self):
+        versions = caching.get_versions([Flight])
+        path = self.write(
+            "schedule.json",
+            json.dumps(
+                [
+                    {
+                        "route": "Boryspil-Heathrow",
+                        "airplane": self.airplane.id,
+                        "departure_time": "2025-06-01T10:00:00Z",
+                        "arrival_time": "2025-06-01T12:00:00Z",
+                    }
+                ]
+            ),
+        )
+
+        self.import_schedule(path)
+
+        self.assertNotEqual(caching.get_versions([Flight]), versions)
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import itineraries
+from airport.models import Flight
+from airport.tests.test_api import (
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+class ItinerarySearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@myproject.com")
+        )
+        self.kyiv = sample_airport(name="Boryspil")
+        self.london = sample_airport(name="Heathrow")
+        self.paris = sample_airport(name="Orly")
+        self.new_york = sample_airport(name="JFK")
+        self.airplane = sample_airplane()
+        self.start = (timezone.now() + timedelta(days=2)).replace(
+            hour=6, minute=0, second=0, microsecond=0
+        )
+
+        kyiv_london = sample_route(self.kyiv, self.london, distance=2100)
+        kyiv_paris = sample_route(self.kyiv, self.paris, distance=2000)
+        london_new_york = sample_route(self.london, self.new_york, distance=5500)
+        paris_new_york = sample_route(self.paris, self.new_york, distance=5800)
+
+        self.to_london = self.flight(kyiv_london, 0, 3)
+        self.to_paris = self.flight(kyiv_paris, 1, 4)
+        self.london_tight = self.flight(london_new_york, 3.5, 11)
+        self.london_late = self.flight(london_new_york, 6, 13)
+        self.from_paris = self.flight(paris_new_york, 5, 13)
+
+    def flight(self, route, departure_hours, arrival_hours):
+        return sample_flight(
+            route=route,
+            airplane=self.airplane,
+            departure_time=self.start + timedelta(hours=departure_hours),
+            arrival_time=self.start + timedelta(hours=arrival_hours),
+        )
+
+    def search(self, **params):
+        res = self.client.get(
+            ITINERARY_URL,
+            {
+                "source": self.kyiv.id,
+                "destination": self.new_york.id,
+                "departure_after": self.start.isoformat(),
+                **params,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [[leg["id"] for leg in itinerary["legs"]] for itinerary in res.data]
+
+    def test_connections_ranked_by_travel_time(self):
+        self.assertEqual(
+            self.search(),
+            [
+                [self.to_paris.id, self.from_paris.id],
+                [self.to_london.id, self.london_late.id],
+            ],
+        )
+        self.assertEqual(
+            self.search(min_connection=30),
+            [
+                [self.to_london.id, self.london_tight.id],
+                [self.to_paris.id, self.from_paris.id],
+                [self.to_london.id, self.london_late.id],
+            ],
+        )
+
+    def test_itinerary_representation(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {
+                "source": self.kyiv.id,
+                "destination": self.new_york.id,
+                "departure_after": self.start.isoformat(),
+                "limit": 1,
+            },
+        )
+
+        itinerary = res.data[0]
+        self.assertEqual(itinerary["duration"], "12:00:00")
+        self.assertEqual(itinerary["distance"], 7800)
+        self.assertEqual(itinerary["connections"], 1)
+        self.assertEqual(itinerary["legs"][0]["route"], "Boryspil-Orly")
+        self.assertEqual(itinerary["legs"][0]["tickets_available"], 60)
+
+    def test_sort_by_distance(self):
+        self.assertEqual(
+            self.search(sort="distance", limit=1),
+            [[self.to_london.id, self.london_late.id]],
+        )
+
+    def test_max_legs_and_departure_window(self):
+        self.assertEqual(self.search(max_legs=1), [])
+        self.assertEqual(
+            self.search(
+                departure_before=(self.start + timedelta(minutes=30)).isoformat()
+            ),
+            [[self.to_london.id, self.london_late.id]],
+        )
+
+    def test_full_flights_are_skipped(self):
+        Flight.objects.filter(pk=self.from_paris.id).update(tickets_sold=59)
+
+        self.assertEqual(
+            self.search(passengers=2),
+            [[self.to_london.id, self.london_late.id]],
+        )
+        self.assertEqual(len(self.search(passengers=1)), 2)
+
+    def test_index_follows_flight_changes(self):
+        self.search()
+        index = itineraries._index
+
+        with self.captureOnCommitCallbacks(execute=True):
+            direct = self.flight(self.to_london.route, 8, 9)
+            direct.route = sample_route(self.kyiv, self.new_york, distance=7000)
+            direct.save()
+        from_paris_id = self.from_paris.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.from_paris.delete()
+
+        with mock.patch.object(
+            itineraries.RouteIndex, "build", side_effect=AssertionError
+        ):
+            self.assertEqual(
+                self.search(),
+                [[direct.id], [self.to_london.id, self.london_late.id]],
+            )
+        self.assertIs(itineraries._index, index)
+        self.assertNotIn(from_paris_id, index.flights)
+
+    def test_changes_published_elsewhere_are_replayed(self):
+        self.search()
+        index = itineraries._index
+        # as if another process made the change
+        itineraries._index = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.from_paris.delete()
+        itineraries._index = index
+
+        with mock.patch.object(
+            itineraries.RouteIndex, "build", side_effect=AssertionError
+        ):
+            self.assertEqual(self.search(), [[self.to_london.id, self.london_late.id]])
+        self.assertIs(itineraries._index, index)
+
+    def test_index_rebuilt_after_change_elsewhere(self):
+        self.search()
+        index = itineraries._index
+
+        itineraries.invalidate()
+        self.search()
+
+        self.assertIsNot(itineraries._index, index)
+
+    def test_same_source_and_destination_rejected(self):
+        res = self.client.get(
+            ITINERARY_URL, {"source": self.kyiv.id, "destination": self.kyiv.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,121 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.tests.test_api import (
+    FLIGHT_URL,
+    ORDER_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_flights(self, departures):
+        route = sample_route()
+        airplane = sample_airplane()
+        return [
+            sample_flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=2),
+            )
+            for departure in departures
+        ]
+
+    def collect(self, url, direction="next"):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            page_ids = [item["id"] for item in res.data["results"]]
+            ids.extend(page_ids if direction == "next" else reversed(page_ids))
+            url = res.data[direction]
+        return ids
+
+    def test_flights_pages_follow_departure_time_and_id(self):
+        start = datetime(2024, 8, 12, tzinfo=timezone.utc)
+        # pairs of flights share a departure time to exercise the id tie-break
+        flights = self.create_flights(
+            [start + timedelta(hours=index // 2) for index in range(7)][::-1]
+        )
+        expected = [
+            flight.id
+            for flight in sorted(flights, key=lambda f: (f.departure_time, f.id))
+        ]
+
+        ids = self.collect(f"{FLIGHT_URL}?pagination=cursor&limit=2")
+
+        self.assertEqual(ids, expected)
+
+    def test_flights_previous_links(self):
+        start = datetime(2024, 8, 12, tzinfo=timezone.utc)
+        flights = self.create_flights([start + timedelta(hours=h) for h in range(5)])
+
+        url = f"{FLIGHT_URL}?pagination=cursor&limit=2"
+        while True:
+            res = self.client.get(url)
+            if not res.data["next"]:
+                break
+            url = res.data["next"]
+        last_page = [item["id"] for item in res.data["results"]]
+        self.assertIsNone(
+            self.client.get(f"{FLIGHT_URL}?pagination=cursor").data["previous"]
+        )
+
+        ids = last_page[::-1] + self.collect(res.data["previous"], "previous")
+
+        self.assertEqual(ids, [flight.id for flight in flights][::-1])
+
+    def test_default_pagination_is_unchanged(self):
+        self.create_flights([datetime(2024, 8, 12, tzinfo=timezone.utc)])
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.data["count"], 1)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(f"{FLIGHT_URL}?cursor=garbage")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_positions(self):
+        for url in (FLIGHT_URL, ORDER_URL):
+            for position in (["garbage", 1], [1, "x"], [None, None], [[1], 2], [1]):
+                with self.subTest(url=url, position=position):
+                    cursor = urlsafe_b64encode(
+                        json.dumps({"p": position, "r": 0}).encode()
+                    ).decode()
+
+                    res = self.client.get(url, {"cursor": cursor})
+
+                    self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_orders_newest_first(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(5)]
+
+        ids = self.collect(f"{ORDER_URL}?pagination=cursor&limit=2")
+
+        self.assertEqual(
+            ids,
+            [
+                order.id
+                for order in sorted(
+                    orders, key=lambda o: (-o.created_at.timestamp(), o.id)
+                )
+            ],
+        )
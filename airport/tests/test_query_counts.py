@@ -0,0 +1,242 @@
+import json
+import os
+from datetime import timedelta
+from itertools import count
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport import holds
+from airport.models import Order, Ticket
+from airport.tests.test_api import (
+    sample_airplane,
+    sample_airplane_type,
+    sample_airport,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+from airport.urls import router
+
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+# UPDATE_QUERY_BUDGETS=1 python manage.py test airport.tests.test_query_counts
+UPDATE_BUDGETS = bool(os.environ.get("UPDATE_QUERY_BUDGETS"))
+
+
+def router_endpoints() -> list[str]:
+    """Every "METHOD url-name" routed by airport.urls.router"""
+    endpoints = set()
+    for pattern in router.urls:
+        actions = getattr(pattern.callback, "actions", None) or {}
+        endpoints.update(
+            f"{method.upper()} {pattern.name}" for method in actions if method != "head"
+        )
+    return sorted(endpoints)
+
+
+class QueryCountTest(TestCase):
+    """
+    Requests every routed endpoint with N and then 10N rows of related
+    data and fails if the number of queries changes or goes over the
+    budget recorded in query_budgets.json.
+    """
+
+    N = 2
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.numbers = count()
+        self.start = timezone.now() + timedelta(days=1)
+        self.hub_route = sample_route(
+            sample_airport(name="Hub Source"), sample_airport(name="Hub Destination")
+        )
+        self.hub_crew = sample_crew(first_name="Hub")
+        self.hub_flight = sample_flight(
+            route=self.hub_route,
+            airplane=sample_airplane(name="Hub Airplane", rows=100, seats_in_row=10),
+            departure_time=self.start,
+            arrival_time=self.start + timedelta(hours=2),
+        )
+        self.addCleanup(
+            holds.get_hold_store().release, self.hub_flight.id, self.user.id
+        )
+
+    def populate(self, n) -> None:
+        """Add n rows of everything, attached to the hub objects too"""
+        for _ in range(n):
+            number = next(self.numbers)
+            route = sample_route(
+                sample_airport(name=f"Source {number}"),
+                sample_airport(name=f"Destination {number}"),
+            )
+            airplane = sample_airplane(
+                airplane_type=sample_airplane_type(name=f"Type {number}"),
+                name=f"Airplane {number}",
+            )
+            crew = sample_crew(first_name=f"First {number}")
+            departure = self.start + timedelta(hours=number)
+            flights = [
+                sample_flight(
+                    route=flight_route,
+                    airplane=airplane,
+                    departure_time=departure,
+                    arrival_time=departure + timedelta(hours=2),
+                )
+                for flight_route in (route, self.hub_route)
+            ]
+            for flight in flights:
+                flight.crew.add(crew, self.hub_crew)
+            self.hub_flight.crew.add(crew)
+
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(order=order, flight=flights[0], row=1, seat=1)
+            Ticket.objects.create(
+                order=order,
+                flight=self.hub_flight,
+                row=number // 10 + 2,
+                seat=number % 10 + 1,
+            )
+
+    def request_for(self, endpoint) -> dict:
+        """The user, url and payload to call an endpoint with"""
+        hub_flight = reverse("airport:flight-detail", args=[self.hub_flight.id])
+        flight = {
+            "route": self.hub_route.id,
+            "airplane": self.hub_flight.airplane_id,
+            "departure_time": self.start.isoformat(),
+            "arrival_time": (self.start + timedelta(hours=3)).isoformat(),
+            "crew": [self.hub_crew.id],
+        }
+        requests = {
+            "GET airplane-list": {},
+            "POST airplane-list": {
+                "data": {
+                    "name": "New",
+                    "rows": 10,
+                    "seats_in_row": 4,
+                    "airplane_type": self.hub_flight.airplane.airplane_type_id,
+                }
+            },
+            "GET airplanetype-list": {},
+            "POST airplanetype-list": {"data": {"name": "New"}},
+            "GET airport-list": {},
+            "POST airport-list": {"data": {"name": "New", "closest_big_city": "New"}},
+            "GET crew-list": {},
+            "POST crew-list": {
+                "data": {"first_name": "New", "last_name": "New", "flights": []}
+            },
+            "GET route-list": {},
+            "POST route-list": {
+                "data": {
+                    "source": self.hub_route.source_id,
+                    "destination": self.hub_route.destination_id,
+                    "distance": 100,
+                }
+            },
+            "GET flight-list": {},
+            "POST flight-list": {"data": flight},
+            "GET flight-detail": {"url": hub_flight},
+            "PUT flight-detail": {"url": hub_flight, "data": flight},
+            "PATCH flight-detail": {"url": hub_flight, "data": {"crew": []}},
+            "DELETE flight-detail": {"url": hub_flight},
+            "GET flight-availability": {},
+            "GET flight-calendar": {"data": {"route": self.hub_flight.route_id}},
+            "GET flight-seat-map": {"data": {"encoding": "rle", "by_row": True}},
+            "GET flight-export": {},
+            "POST flight-hold": {
+                "user": self.user,
+                "data": {"seats": [{"row": 1, "seat": 1}]},
+            },
+            "DELETE flight-hold": {"user": self.user},
+            "GET itinerary-list": {
+                "user": self.user,
+                "data": {
+                    "source": self.hub_route.source_id,
+                    "destination": self.hub_route.destination_id,
+                    "departure_after": self.start.isoformat(),
+                },
+            },
+            "GET order-list": {"user": self.user},
+            "POST order-list": {
+                "user": self.user,
+                "data": {
+                    "tickets": [
+                        {"flight": self.hub_flight.id, "row": 1, "seat": seat}
+                        for seat in (1, 2)
+                    ]
+                },
+            },
+            "GET order-export": {},
+        }
+        request = requests[endpoint]
+        method, name = endpoint.split()
+        if "url" not in request:
+            detail = name in ("flight-availability", "flight-hold", "flight-seat-map")
+            args = [self.hub_flight.id] if detail else []
+            request["url"] = reverse(f"airport:{name}", args=args)
+        request.setdefault("user", self.admin)
+        request["method"] = method
+        return request
+
+    def count_queries(self, endpoint) -> int:
+        request = self.request_for(endpoint)
+        client = APIClient()
+        client.force_authenticate(request["user"])
+        data = request.get("data")
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                if request["method"] == "GET":
+                    # list every row on a single page
+                    res = client.get(request["url"], data or {"limit": 1000})
+                else:
+                    res = client.generic(
+                        request["method"],
+                        request["url"],
+                        json.dumps(data) if data is not None else "",
+                        content_type="application/json",
+                    )
+                if res.streaming:
+                    b"".join(res.streaming_content)
+            transaction.set_rollback(True)
+        self.assertLess(
+            res.status_code, 400, f"{endpoint}: {getattr(res, 'data', None)}"
+        )
+        return len(queries)
+
+    def test_every_endpoint_has_a_request(self):
+        for endpoint in router_endpoints():
+            with self.subTest(endpoint):
+                self.assertIn("url", self.request_for(endpoint))
+
+    def test_queries_do_not_grow_with_data(self):
+        endpoints = router_endpoints()
+        self.populate(self.N)
+        small = {endpoint: self.count_queries(endpoint) for endpoint in endpoints}
+        self.populate(9 * self.N)
+        large = {endpoint: self.count_queries(endpoint) for endpoint in endpoints}
+
+        if UPDATE_BUDGETS:
+            BUDGETS_PATH.write_text(json.dumps(large, indent=2) + "\n")
+        budgets = json.loads(BUDGETS_PATH.read_text())
+        for endpoint in endpoints:
+            with self.subTest(endpoint):
+                self.assertEqual(
+                    large[endpoint],
+                    small[endpoint],
+                    f"{endpoint} runs more queries with more data",
+                )
+                self.assertIn(endpoint, budgets, "no query budget recorded")
+                self.assertLessEqual(large[endpoint], budgets[endpoint])
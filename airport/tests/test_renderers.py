@@ -0,0 +1,84 @@
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport import parsers, renderers
+from airport.models import Airport
+from airport.parsers import FastJSONParser
+from airport.renderers import FastJSONRenderer
+
+
+class FastJSONTest(TestCase):
+    data = {
+        "text": "Київ",
+        "utc": datetime(2024, 8, 12, 10, 0, 0, 123456, tzinfo=timezone.utc),
+        "offset": datetime(2024, 8, 12, 10, tzinfo=timezone(timedelta(hours=3))),
+        "price": Decimal("10.50"),
+        "duration": timedelta(hours=2),
+        "id": uuid.UUID(int=1),
+        "seats": {1: [1, 2]},
+        "empty": None,
+    }
+
+    def test_renders_like_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        )
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            rendered = FastJSONRenderer().render(self.data)
+
+        self.assertEqual(rendered, JSONRenderer().render(self.data))
+
+    def test_indented_output_uses_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, "application/json; indent=4"),
+            JSONRenderer().render(self.data, "application/json; indent=4"),
+        )
+
+    def test_parses_json(self):
+        for orjson in (renderers.orjson, None):
+            with self.subTest(orjson=orjson), mock.patch.object(
+                parsers, "orjson", orjson
+            ):
+                parsed = FastJSONParser().parse(
+                    io.BytesIO('{"a": ["ї", 1.5]}'.encode())
+                )
+
+                self.assertEqual(parsed, {"a": ["ї", 1.5]})
+
+    def test_rejects_invalid_json(self):
+        for body in (b"{", b'{"a": NaN}', b"\xff"):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    def test_api_round_trip(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@myproject.com", "pass")
+        )
+        url = reverse("airport:airport-list")
+
+        res = client.post(
+            url,
+            '{"name": "Бориспіль", "closest_big_city": "Київ"}',
+            content_type="application/json",
+        )
+        malformed = client.post(url, "{", content_type="application/json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(res.json()["name"], "Бориспіль")
+        self.assertEqual(Airport.objects.get().closest_big_city, "Київ")
+        self.assertEqual(malformed.status_code, status.HTTP_400_BAD_REQUEST)
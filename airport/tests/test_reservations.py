@@ -0,0 +1,118 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+
+from airport import booking
+from airport.exceptions import SeatsUnavailable
+from airport.models import Order, Ticket
+from airport.tests.test_api import sample_flight
+
+
+THREADS = 12
+
+
+class ConcurrentReservationTest(TransactionTestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        self.users = [
+            get_user_model().objects.create_user(f"user{index}@myproject.com")
+            for index in range(THREADS)
+        ]
+
+    def book_concurrently(self, place_for_index):
+        barrier = threading.Barrier(THREADS)
+        results = []
+
+        def book(index, user):
+            row, seat = place_for_index(index)
+            tickets_data = [{"flight": self.flight, "row": row, "seat": seat}]
+            try:
+                barrier.wait()
+                booking.place_order(tickets_data, user=user)
+                results.append("booked")
+            except SeatsUnavailable:
+                results.append("conflict")
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=book, args=(index, user))
+            for index, user in enumerate(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_one_winner_for_the_same_seat(self):
+        results = self.book_concurrently(lambda index: (1, 1))
+
+        self.assertEqual(results.count("booked"), 1)
+        self.assertEqual(results.count("conflict"), THREADS - 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+    def test_distinct_seats_all_succeed(self):
+        results = self.book_concurrently(lambda index: (index // 6 + 1, index % 6 + 1))
+
+        self.assertEqual(results, ["booked"] * THREADS)
+        self.assertEqual(Ticket.objects.count(), THREADS)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, THREADS)
+
+
+class PlaceOrderRetryTest(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.tickets_data = [{"flight": self.flight, "row": 1, "seat": 1}]
+
+    @mock.patch("airport.booking.time.sleep")
+    def test_transient_error_is_retried(self, sleep):
+        book_tickets = booking.book_tickets
+        attempts = []
+
+        def flaky_book_tickets(*args):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise OperationalError("database is locked")
+            return book_tickets(*args)
+
+        with mock.patch("airport.booking.book_tickets", flaky_book_tickets):
+            order = booking.place_order(self.tickets_data, user=self.user)
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(order.tickets.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+        sleep.assert_called_once_with(booking.RETRY_DELAY)
+
+    @mock.patch("airport.booking.time.sleep")
+    def test_retries_are_bounded(self, sleep):
+        with mock.patch(
+            "airport.booking.book_tickets",
+            side_effect=OperationalError("database is locked"),
+        ):
+            with self.assertRaises(OperationalError):
+                booking.place_order(self.tickets_data, user=self.user)
+
+        self.assertEqual(sleep.call_count, booking.MAX_ATTEMPTS - 1)
+        self.assertEqual(Order.objects.count(), 0)
+
+
+class LocalLocksTest(TestCase):
+    def test_flights_share_pooled_locks(self):
+        flight_ids = [booking.LOCK_POOL_SIZE + 1, 1, 2]
+
+        # 1 and LOCK_POOL_SIZE + 1 share a lock, taking it twice would hang
+        with booking._local_locks(flight_ids):
+            self.assertEqual(
+                [lock.locked() for lock in booking._flight_locks[:4]],
+                [False, True, True, False],
+            )
+        self.assertFalse(any(lock.locked() for lock in booking._flight_locks))
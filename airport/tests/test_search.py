@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.tests.test_api import (
+    FLIGHT_URL,
+    ROUTE_URL,
+    sample_airplane,
+    sample_airport,
+    sample_flight,
+    sample_route,
+)
+
+
+class AirportSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@myproject.com")
+        )
+        self.boryspil = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        self.heathrow = sample_airport(name="Heathrow", closest_big_city="London")
+        self.jfk = sample_airport(name="JFK", closest_big_city="New York")
+        self.kyiv_london = sample_route(self.boryspil, self.heathrow)
+        self.london_new_york = sample_route(self.heathrow, self.jfk)
+
+    def result_ids(self, url, params):
+        res = self.client.get(url, params)
+        return sorted(item["id"] for item in res.data["results"])
+
+    def test_search_routes_by_airport_name_and_city(self):
+        self.assertEqual(
+            self.result_ids(ROUTE_URL, {"search": "bory"}), [self.kyiv_london.id]
+        )
+        self.assertEqual(
+            self.result_ids(ROUTE_URL, {"search": "London"}),
+            sorted([self.kyiv_london.id, self.london_new_york.id]),
+        )
+        self.assertEqual(
+            self.result_ids(ROUTE_URL, {"search": "kyiv heathrow"}),
+            [self.kyiv_london.id],
+        )
+        self.assertEqual(self.result_ids(ROUTE_URL, {"search": "Paris"}), [])
+
+    def test_filter_routes_by_source_and_destination(self):
+        self.assertEqual(
+            self.result_ids(ROUTE_URL, {"source": "heath"}),
+            [self.london_new_york.id],
+        )
+        self.assertEqual(
+            self.result_ids(ROUTE_URL, {"destination": "heath"}),
+            [self.kyiv_london.id],
+        )
+
+    def test_search_flights_by_route_airports(self):
+        airplane = sample_airplane()
+        from_kyiv = sample_flight(route=self.kyiv_london, airplane=airplane)
+        to_new_york = sample_flight(route=self.london_new_york, airplane=airplane)
+
+        self.assertEqual(
+            self.result_ids(FLIGHT_URL, {"search": "kyiv"}), [from_kyiv.id]
+        )
+        self.assertEqual(
+            self.result_ids(FLIGHT_URL, {"source": "London", "destination": "new"}),
+            [to_new_york.id],
+        )
@@ -0,0 +1,223 @@
+import base64
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import holds, seat_map
+from airport.models import Airplane, Ticket, Order
+from airport.tests.test_api import ORDER_URL, sample_flight
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=[flight_id])
+
+
+def mock_airplane(rows, seats_in_row):
+    return Airplane(rows=rows, seats_in_row=seats_in_row)
+
+
+class SeatMapTest(TestCase):
+    def test_add_and_discard(self):
+        seats = seat_map.SeatMap(rows=3, seats_in_row=3)
+        seats.add(1, 1)
+        seats.add(3, 3)
+
+        self.assertIn((3, 3), seats)
+        self.assertNotIn((2, 2), seats)
+        self.assertEqual(seats.taken_seats(), [(1, 1), (3, 3)])
+        self.assertEqual(seats.available, 7)
+
+        seats.discard(1, 1)
+        self.assertEqual(seats.taken_seats(), [(3, 3)])
+
+    def test_places_outside_the_airplane(self):
+        seats = seat_map.SeatMap(rows=2, seats_in_row=2)
+        seats.add(1, 3)
+        seats.add(3, 1)
+        seats.discard(0, 1)
+
+        self.assertNotIn((1, 3), seats)
+        self.assertEqual(seats.taken, 0)
+
+    def test_dump_and_load(self):
+        seats = seat_map.SeatMap(rows=10, seats_in_row=6)
+        seats.add(10, 6)
+
+        loaded = seat_map.SeatMap.load(seats.dump())
+        self.assertEqual(loaded.taken_seats(), [(10, 6)])
+        self.assertEqual(loaded.capacity, 60)
+
+    def test_encodings(self):
+        seats = seat_map.SeatMap.for_airplane(
+            mock_airplane(3, 3), [(1, 1), (1, 2), (3, 3)]
+        )
+
+        self.assertEqual(base64.b64decode(seats.encode()), b"\xc0\x80")
+        self.assertEqual(seats.runs(), [0, 2, 6, 1])
+        self.assertEqual(seat_map.SeatMap(2, 2).runs(), [4])
+        self.assertEqual(seats.available_by_row(), [1, 3, 2])
+
+    def test_union(self):
+        taken = seat_map.SeatMap.for_airplane(mock_airplane(2, 2), [(1, 1)])
+        held = seat_map.SeatMap.for_airplane(mock_airplane(2, 2), [(2, 2)])
+
+        self.assertEqual((taken | held).taken_seats(), [(1, 1), (2, 2)])
+        self.assertEqual(taken.taken_seats(), [(1, 1)])
+
+
+class SeatMapCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+
+    def test_map_is_built_from_tickets(self):
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=self.order)
+
+        self.assertEqual(seat_map.get_seat_map(self.flight).taken_seats(), [(2, 3)])
+
+    def test_order_updates_cached_map(self):
+        seat_map.get_seat_map(self.flight)
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            seats = seat_map.get_seat_map(self.flight)
+        self.assertEqual(seats.taken_seats(), [(1, 1), (1, 2)])
+
+    def test_booking_during_rebuild_is_kept(self):
+        # a booking commits while the map is being built from the tickets
+        # read before it, and its update has to wait for the build
+        booking = threading.Thread(
+            target=seat_map.update_seat_map, args=(self.flight.id, [(5, 5)])
+        )
+        filter_tickets = Ticket.objects.filter
+
+        def filter_then_book(*args, **kwargs):
+            tickets = filter_tickets(*args, **kwargs)
+            booking.start()
+            booking.join(timeout=0.2)
+            return tickets
+
+        with mock.patch.object(Ticket.objects, "filter", filter_then_book):
+            seat_map.get_seat_map(self.flight)
+        booking.join()
+
+        self.assertEqual(seat_map.get_seat_map(self.flight).taken_seats(), [(5, 5)])
+
+    def test_deleted_ticket_frees_seat(self):
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        seat_map.get_seat_map(self.flight)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(seat_map.get_seat_map(self.flight).taken, 0)
+
+    def test_airplane_shrunk_below_tickets(self):
+        Ticket.objects.create(row=1, seat=6, flight=self.flight, order=self.order)
+        Ticket.objects.create(row=10, seat=1, flight=self.flight, order=self.order)
+        seat_map.get_seat_map(self.flight)
+        airplane = self.flight.airplane
+
+        for rows, seats_in_row, taken in ((10, 4, [(10, 1)]), (5, 4, [])):
+            airplane.rows, airplane.seats_in_row = rows, seats_in_row
+            with self.captureOnCommitCallbacks(execute=True):
+                airplane.save()
+
+            detail = self.client.get(flight_detail_url(self.flight.id))
+            availability = self.client.get(
+                reverse("airport:flight-availability", args=[self.flight.id])
+            )
+
+            self.assertEqual(detail.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [
+                    (place["row"], place["seat"])
+                    for place in detail.data["taken_places"]
+                ],
+                taken,
+            )
+            self.assertEqual(availability.status_code, status.HTTP_200_OK)
+
+    def test_flight_detail_taken_places(self):
+        Ticket.objects.create(row=4, seat=2, flight=self.flight, order=self.order)
+        Ticket.objects.create(row=1, seat=5, flight=self.flight, order=self.order)
+
+        res = self.client.get(flight_detail_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["taken_places"],
+            [{"row": 1, "seat": 5}, {"row": 4, "seat": 2}],
+        )
+
+    def test_seat_map_endpoint(self):
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=self.order)
+        holds.get_hold_store().hold(self.flight.id, [(2, 1)], self.user.id)
+        self.addCleanup(holds.get_hold_store().release, self.flight.id, self.user.id)
+
+        bitmap = self.client.get(seat_map_url(self.flight.id))
+        rle = self.client.get(
+            seat_map_url(self.flight.id), {"encoding": "rle", "by_row": "true"}
+        )
+
+        self.assertEqual(bitmap.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {key: bitmap.data[key] for key in ("capacity", "taken", "held")},
+            {"capacity": 60, "taken": 2, "held": 1},
+        )
+        self.assertEqual(bitmap.data["available"], 57)
+        self.assertEqual(base64.b64decode(bitmap.data["taken_seats"])[:1], b"\xc0")
+        self.assertNotIn("available_by_row", bitmap.data)
+        self.assertEqual(rle.data["taken_seats"], [0, 2, 58])
+        self.assertEqual(rle.data["held_seats"], [6, 1, 53])
+        self.assertEqual(rle.data["available_by_row"], [4, 5] + [6] * 8)
+
+    def test_seat_map_with_holds_outside_the_airplane(self):
+        holds.get_hold_store().hold(self.flight.id, [(1, 6), (10, 1)], self.user.id)
+        self.addCleanup(holds.get_hold_store().release, self.flight.id, self.user.id)
+        airplane = self.flight.airplane
+        airplane.rows, airplane.seats_in_row = 5, 4
+        with self.captureOnCommitCallbacks(execute=True):
+            airplane.save()
+
+        res = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {key: res.data[key] for key in ("capacity", "held", "available")},
+            {"capacity": 20, "held": 0, "available": 20},
+        )
+        self.assertEqual(res.data["held_seats"], [20])
+
+    def test_seat_map_rejects_unknown_encoding(self):
+        res = self.client.get(seat_map_url(self.flight.id), {"encoding": "png"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import holds, throttling
+from airport.tests.test_api import FLIGHT_URL, ORDER_URL, sample_flight
+from airport.tests.test_holds import FakeClock
+
+
+def with_rates(**rates):
+    return override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+                **rates,
+            },
+        }
+    )
+
+
+class CacheCounterStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.clock.now = 6000.0
+        self.store = throttling.CacheCounterStore(clock=self.clock)
+
+    def hit(self):
+        return self.store.hit("client", limit=3, duration=60)
+
+    def test_limits_requests_in_window(self):
+        results = [self.hit() for _ in range(4)]
+
+        self.assertEqual(results[:3], [(True, 0.0)] * 3)
+        # the next window counts all 3 until a third of it has passed
+        self.assertEqual(results[3], (False, 80.0))
+
+    def test_previous_window_slides_out(self):
+        for _ in range(3):
+            self.hit()
+
+        self.clock.now += 60
+        self.assertFalse(self.hit()[0])
+        self.clock.now += 20
+        self.assertTrue(self.hit()[0])
+        # 3 * 40 / 60 + 1 leaves no room until 3 * (60 - t) / 60 <= 1
+        self.assertEqual(self.hit(), (False, 20.0))
+        self.clock.now += 20
+        self.assertTrue(self.hit()[0])
+
+    def test_rejected_requests_are_not_counted(self):
+        for _ in range(10):
+            self.hit()
+
+        self.clock.now += 120
+        self.assertEqual([self.hit()[0] for _ in range(4)], [True] * 3 + [False])
+
+
+class ScopedThrottleApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(
+            throttling, "_store", throttling.CacheCounterStore()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flight = sample_flight()
+        self.user = get_user_model().objects.create_user("user@myproject.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def order(self, seat):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": seat, "flight": self.flight.id}]},
+            format="json",
+        )
+
+    @with_rates(booking="2/minute")
+    def test_booking_scope_returns_retry_after(self):
+        responses = [self.order(seat) for seat in range(1, 4)]
+
+        self.assertEqual(
+            [res.status_code for res in responses],
+            [status.HTTP_201_CREATED] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS],
+        )
+        self.assertGreater(int(responses[2]["Retry-After"]), 0)
+
+    @with_rates(booking="1/minute", browse="2/minute")
+    def test_scopes_are_counted_separately(self):
+        hold_url = reverse("airport:flight-hold", args=[self.flight.id])
+
+        browsing = [self.client.get(FLIGHT_URL).status_code for _ in range(3)]
+        hold = self.client.post(
+            hold_url, {"seats": [{"row": 1, "seat": 1}]}, format="json"
+        )
+        self.addCleanup(holds.get_hold_store().release, self.flight.id, self.user.id)
+        listing_orders = self.client.get(ORDER_URL)
+
+        self.assertEqual(
+            browsing,
+            [status.HTTP_200_OK] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS],
+        )
+        self.assertEqual(hold.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(listing_orders.status_code, status.HTTP_200_OK)
+
+    @with_rates(browse="1/minute")
+    def test_async_views_use_browse_scope(self):
+        url = reverse("airport:async-flight-list")
+
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
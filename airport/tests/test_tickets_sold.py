@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import booking
+from airport.models import DailyAvailability, Flight, Order, Ticket
+from airport.tests.test_api import FLIGHT_URL, ORDER_URL, sample_flight
+
+
+class TicketsSoldTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_order_increments_tickets_sold(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": self.flight.id}
+                for seat in range(1, 4)
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+    def test_ticket_create_and_delete_update_tickets_sold(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_order_delete_recounts_each_flight_once(self):
+        other = sample_flight(route=self.flight.route, airplane=self.flight.airplane)
+        queries = []
+        for row, seats in ((1, 1), (2, 6)):
+            order = booking.place_order(
+                [
+                    {"flight": flight, "row": row, "seat": seat}
+                    for flight in (self.flight, other)
+                    for seat in range(1, seats + 1)
+                ],
+                user=self.user,
+            )
+            with CaptureQueriesContext(connection) as captured:
+                with self.captureOnCommitCallbacks(execute=True):
+                    order.delete()
+            queries.append(len(captured))
+
+        self.assertEqual(queries[0], queries[1])
+        for flight in (self.flight, other):
+            flight.refresh_from_db()
+            self.assertEqual(flight.tickets_sold, 0)
+        day = DailyAvailability.objects.get(route=self.flight.route)
+        self.assertEqual(day.seats_available, day.capacity)
+
+    def test_flight_save_keeps_tickets_sold(self):
+        stale_flight = Flight.objects.get(pk=self.flight.pk)
+        Flight.add_tickets_sold(self.flight.pk, 5)
+
+        stale_flight.save()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 5)
+
+    def test_flight_list_tickets_available(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 59)
+
+
+class ReconcileTicketsSoldCommandTest(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        user = get_user_model().objects.create_user("user@myproject.com")
+        order = Order.objects.create(user=user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_sold=7)
+
+    def test_reconcile_fixes_drift(self):
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+        self.assertIn("Reconciled 1 flights", out.getvalue())
+
+    def test_dry_run_does_not_update(self):
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=StringIO())
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 7)
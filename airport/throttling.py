@@ -0,0 +1,158 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework import throttling
+from rest_framework.settings import api_settings
+
+
+def _windows(key: str, now: float, duration: int) -> tuple[str, str, float]:
+    """Keys of the current and previous window and the time into the current"""
+    window, elapsed = divmod(now, duration)
+    window = int(window)
+    return f"{key}:{window}", f"{key}:{window - 1}", elapsed
+
+
+def _estimate(current: int, previous: int, elapsed: float, duration: int) -> float:
+    """
+    Requests in the last duration seconds, assuming the previous window's
+    were spread evenly over it
+    """
+    return previous * (duration - elapsed) / duration + current
+
+
+def _wait(current, previous, elapsed, duration, limit) -> float:
+    """Seconds until the estimate leaves room for one more request"""
+    room = limit - 1
+    if current >= limit:
+        # this window becomes the previous one, wait until enough of it slid out
+        return duration - elapsed + duration * (1 - room / current)
+    return max(duration - elapsed - duration * (room - current) / previous, 0.0)
+
+
+class CacheCounterStore:
+    """
+    Sliding window request counters in the Django cache: two integers per
+    client and scope, bumped with the cache's atomic incr(). Used with the
+    local-memory cache, so each process counts on its own.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    def hit(self, key: str, limit: int, duration: int) -> tuple[bool, float]:
+        """Count a request unless it is over limit, else say how long to wait"""
+        current_key, previous_key, elapsed = _windows(key, self.clock(), duration)
+        cache.add(current_key, 0, timeout=2 * duration)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # expired between add() and incr()
+            cache.set(current_key, 1, timeout=2 * duration)
+            current = 1
+        previous = cache.get(previous_key, 0)
+        if _estimate(current, previous, elapsed, duration) > limit:
+            cache.decr(current_key)
+            return False, _wait(current - 1, previous, elapsed, duration, limit)
+        return True, 0.0
+
+
+class RedisCounterStore:
+    """
+    Sliding window request counters in Redis, two integers per client and
+    scope that expire after two windows. A Lua script checks and counts a
+    request atomically, so every worker shares the same limits.
+    """
+
+    HIT_SCRIPT = """
+    local limit = tonumber(ARGV[1])
+    local duration = tonumber(ARGV[2])
+    local elapsed = tonumber(ARGV[3])
+    local current = tonumber(redis.call("GET", KEYS[1]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[2]) or "0")
+    if previous * (duration - elapsed) / duration + current + 1 > limit then
+        return {0, current, previous}
+    end
+    current = redis.call("INCR", KEYS[1])
+    if current == 1 then
+        redis.call("PEXPIRE", KEYS[1], 2 * duration)
+    end
+    return {1, current, previous}
+    """
+
+    def __init__(self, connection, clock=time.time):
+        self.connection = connection
+        self.clock = clock
+        self._hit = connection.register_script(self.HIT_SCRIPT)
+
+    def hit(self, key: str, limit: int, duration: int) -> tuple[bool, float]:
+        current_key, previous_key, elapsed = _windows(key, self.clock(), duration)
+        allowed, current, previous = self._hit(
+            keys=[current_key, previous_key],
+            args=[limit, duration * 1000, int(elapsed * 1000)],
+        )
+        if allowed:
+            return True, 0.0
+        return False, _wait(current, previous, elapsed, duration, limit)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_counter_store():
+    """Redis store when the default cache is django-redis, cache based otherwise"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.CACHES["default"]["BACKEND"].startswith("django_redis"):
+                _store = RedisCounterStore(get_redis_connection("default"))
+            else:
+                _store = CacheCounterStore()
+        return _store
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """
+    SimpleRateThrottle counting requests in sliding windows of the
+    counter store instead of keeping a list of request times per client.
+    Rates are read from DEFAULT_THROTTLE_RATES when the throttle is made,
+    so overridden settings apply.
+    """
+
+    def get_rate(self):
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self._wait = get_counter_store().hit(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle, SlidingWindowRateThrottle):
+    """
+    Limits views by their throttle_scope, which viewsets may make depend
+    on the action, e.g. booking for order creation and browse for lists.
+    """
@@ -1,6 +1,7 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from airport import views
+from airport import async_views, views
 
 
 router = DefaultRouter()
@@ -11,8 +12,25 @@ router.register("airplanes", views.AirplaneViewSet)
 router.register("airports", views.AirportViewSet)
 router.register("flights", views.FlightViewSet)
 router.register("routes", views.RouteViewSet)
+router.register("itineraries", views.ItineraryViewSet, basename="itinerary")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/flights/",
+        async_views.FlightListView.as_view(),
+        name="async-flight-list",
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        async_views.FlightDetailView.as_view(),
+        name="async-flight-detail",
+    ),
+    path(
+        "async/flights/<int:pk>/availability/",
+        async_views.FlightAvailabilityView.as_view(),
+        name="async-flight-availability",
+    ),
+]
 
 app_name = "airport"
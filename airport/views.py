@@ -1,14 +1,44 @@
-from django.db.models import F, Count
-from rest_framework import viewsets, filters, mixins
+from django.db.models import Prefetch
+from rest_framework import viewsets, filters, mixins, status
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from airport import models, serializers
+from airport import availability, exports, holds, itineraries, models, serializers
 from airport import filters as custom_filters
+from airport.caching import CachedListMixin
+from airport.pagination import (
+    FlightCursorPagination,
+    OrderCursorPagination,
+    SelectablePaginationMixin,
+)
+from airport.renderers import CSVRenderer, NDJSONRenderer
+
+
+class ValuesListMixin:
+    """
+    Serve list pages from .values() rows rendered by
+    values_serializer_class, which must render exactly what the list
+    serializer does. get_serializer_class() still describes the schema.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page, many=True).data)
+        return Response(serializer_class(queryset, many=True).data)
 
 
 class AirportViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -19,13 +49,19 @@ class AirportViewSet(
 
 
 class RouteViewSet(
+    CachedListMixin,
+    ValuesListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.Route.objects.select_related("source", "destination")
     serializer_class = serializers.RouteSerializer
-    search_fields = ["source", "destination"]
+    values_serializer_class = serializers.RouteListValuesSerializer
+    cache_models = (models.Route, models.Airport)
+    filter_backends = [custom_filters.RouteSearchFilter, DjangoFilterBackend]
+    filterset_class = custom_filters.RouteFilter
+    search_route_field = "id"
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -36,12 +72,20 @@ class RouteViewSet(
 
 
 class CrewViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.Crew.objects.all()
     serializer_class = serializers.CrewSerializer
+    cache_models = (
+        models.Crew,
+        models.Flight,
+        models.Airplane,
+        models.Route,
+        models.Airport,
+    )
     search_fields = ["first_name", "last_name"]
 
     def get_serializer_class(self):
@@ -54,11 +98,19 @@ class CrewViewSet(
     def get_queryset(self):
         queryset = self.queryset
         if self.action in ("retrieve", "list"):
-            queryset = queryset.prefetch_related("flights")
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "flights",
+                    queryset=models.Flight.objects.select_related(
+                        "airplane", "route__source", "route__destination"
+                    ),
+                )
+            )
         return queryset
 
 
 class AirplaneTypeViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -69,6 +121,7 @@ class AirplaneTypeViewSet(
 
 
 class AirplaneViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -78,26 +131,36 @@ class AirplaneViewSet(
     search_fields = ["name"]
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(SelectablePaginationMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = (
-        models.Flight.objects.select_related("airplane", "route")
-        .prefetch_related("crew")
-        .annotate(
-            tickets_available=(
-                F("airplane__rows") * F("airplane__seats_in_row") - Count("tickets")
-            )
+        models.Flight.objects.select_related(
+            "airplane", "route__source", "route__destination"
         )
+        .prefetch_related("crew")
+        .with_tickets_available()
     )
     serializer_class = serializers.FlightSerializer
+    values_serializer_class = serializers.FlightListValuesSerializer
+    cursor_pagination_class = FlightCursorPagination
     filter_backends = [
         filters.OrderingFilter,
-        filters.SearchFilter,
+        custom_filters.RouteSearchFilter,
         DjangoFilterBackend,
     ]
     filterset_class = custom_filters.FlightFilter
-    search_fields = ["airplane", "route"]
+    search_route_field = "route"
     ordering_fields = ["route", "departure_time", "arrival_time"]
 
+    @property
+    def throttle_scope(self):
+        return "booking" if self.action == "hold" else "browse"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("availability", "seat_map"):
+            return queryset.prefetch_related(None)
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "list":
             return serializers.FlightListSerializer
@@ -105,18 +168,118 @@ class FlightViewSet(viewsets.ModelViewSet):
             return serializers.FlightDetailSerializer
         return self.serializer_class
 
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=(IsAuthenticated,),
+        serializer_class=serializers.SeatHoldSerializer,
+    )
+    def hold(self, request, pk=None):
+        """Hold seats for a few minutes before ordering them, or release them"""
+        flight = self.get_object()
+        if request.method == "DELETE":
+            holds.get_hold_store().release(flight.id, request.user.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "flight": flight},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, serializer_class=serializers.FlightAvailabilitySerializer)
+    def availability(self, request, pk=None):
+        """Taken and held seats of a flight and how many are still free"""
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @extend_schema(parameters=[serializers.SeatMapQuerySerializer])
+    @action(
+        detail=True,
+        url_path="seat-map",
+        serializer_class=serializers.FlightSeatMapSerializer,
+    )
+    def seat_map(self, request, pk=None):
+        """Taken and held seats as a base64 bitmap or run lengths, with counts"""
+        query = serializers.SeatMapQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        serializer = self.get_serializer(
+            self.get_object(),
+            context={**self.get_serializer_context(), **query.validated_data},
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[serializers.CalendarQuerySerializer],
+        responses=serializers.DailyAvailabilitySerializer(many=True),
+    )
+    @action(
+        detail=False,
+        filter_backends=[],
+        serializer_class=serializers.DailyAvailabilitySerializer,
+    )
+    def calendar(self, request):
+        """Flights and seats left on each day of a route that has flights"""
+        query = serializers.CalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        days = availability.calendar(**query.validated_data)
+        return Response(self.get_serializer(days, many=True).data)
+
+    @extend_schema(responses=OpenApiTypes.STR)
+    @action(detail=False, renderer_classes=(NDJSONRenderer, CSVRenderer))
+    def export(self, request):
+        """Stream all filtered flights as NDJSON or, with ?format=csv, CSV"""
+        return exports.stream_response(
+            request,
+            exports.flight_rows(self.filter_queryset(self.get_queryset())),
+            exports.FLIGHT_FIELDS,
+            "flights",
+        )
+
+
+class ItineraryViewSet(GenericViewSet):
+    serializer_class = serializers.ItinerarySerializer
+    throttle_scope = "browse"
+
+    @extend_schema(
+        parameters=[serializers.ItinerarySearchSerializer],
+        responses=serializers.ItinerarySerializer(many=True),
+    )
+    def list(self, request):
+        """Best flight connections between two airports, see airport.itineraries"""
+        search = serializers.ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        found = itineraries.find_itineraries(**search.validated_data)
+        return Response(self.get_serializer(found, many=True).data)
+
 
 class OrderViewSet(
+    SelectablePaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
 ):
-    queryset = models.Order.objects.prefetch_related("tickets__flight")
+    queryset = models.Order.objects.prefetch_related(
+        Prefetch(
+            "tickets__flight",
+            queryset=models.Flight.objects.select_related(
+                "airplane", "route__source", "route__destination"
+            ).with_tickets_available(),
+        )
+    )
     serializer_class = serializers.OrderSerializer
     permission_classes = (IsAuthenticated,)
+    cursor_pagination_class = OrderCursorPagination
+
+    @property
+    def throttle_scope(self):
+        return "booking" if self.action == "create" else None
 
     def get_queryset(self):
-        return models.Order.objects.filter(user=self.request.user)
+        if self.action == "export":
+            return models.Order.objects.all()
+        return self.queryset.filter(user=self.request.user)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -126,3 +289,18 @@ class OrderViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(responses=OpenApiTypes.STR)
+    @action(
+        detail=False,
+        permission_classes=(IsAdminUser,),
+        renderer_classes=(NDJSONRenderer, CSVRenderer),
+    )
+    def export(self, request):
+        """Stream the tickets of all orders as NDJSON or, with ?format=csv, CSV"""
+        return exports.stream_response(
+            request,
+            exports.order_rows(self.get_queryset()),
+            exports.ORDER_FIELDS,
+            "orders",
+        )
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# Async views run their queries in threads that outlive the request, so a
+# persistent connection is never closed; pool with PgBouncer instead
+os.environ["CONN_MAX_AGE"] = "0"
 
 application = get_asgi_application()
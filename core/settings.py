@@ -13,7 +13,9 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import sys
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 
@@ -26,16 +28,28 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = (
-    os.getenv("SECRET_KEY")
-    or "django-insecure-ei1_$1c(#d$&1-y07d@!mi_%4eoi$o6+4&s8x$4$@_f5wzaw3o"
+# Settings profile: dev (the default), test (the default for
+# "manage.py test") or prod. Only dev runs in DEBUG with the debug toolbar.
+PROFILES = ("dev", "test", "prod")
+PROFILE = os.getenv("DJANGO_PROFILE") or (
+    "test" if sys.argv[1:2] == ["test"] else "dev"
 )
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(
+        f"DJANGO_PROFILE must be one of {', '.join(PROFILES)}, not {PROFILE!r}"
+    )
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    if PROFILE == "prod":
+        raise ImproperlyConfigured("SECRET_KEY must be set in the prod profile")
+    SECRET_KEY = "django-insecure-ei1_$1c(#d$&1-y07d@!mi_%4eoi$o6+4&s8x$4$@_f5wzaw3o"
 
 # SECURITY WARNING: don"t run with debug turned on in production!
-DEBUG = True
+DEBUG = PROFILE == "dev"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -51,7 +65,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "rest_framework",
     "django_filters",
     "user",
@@ -60,7 +73,6 @@ INSTALLED_APPS = [
 ]
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -69,6 +81,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if PROFILE == "dev":
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -91,19 +107,32 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["rest_framework.filters.SearchFilter"],
-    "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
-    ],
+    "DEFAULT_AUTHENTICATION_CLASSES": ["user.authentication.CachedJWTAuthentication"],
     "DEFAULT_PERMISSION_CLASSES": [
         "airport.permissions.IsAdminOrIfAuthenticatedReadOnly",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "airport.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "airport.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport.throttling.AnonRateThrottle",
+        "airport.throttling.UserRateThrottle",
+        "airport.throttling.ScopedRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "100/day",
+        "user": "1000/day",
+        "browse": "300/minute",
+        "booking": "30/minute",
+    },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
@@ -149,6 +178,13 @@ if os.getenv("DATABASE_TYPE") == "POSTGRES":
             "PASSWORD": os.environ["POSTGRES_PASSWORD"],
             "HOST": os.environ["POSTGRES_HOST"],
             "PORT": os.environ["POSTGRES_PORT"],
+            # keep a connection per worker thread instead of one per request
+            "CONN_MAX_AGE": int(os.getenv("CONN_MAX_AGE") or 60),
+            "CONN_HEALTH_CHECKS": os.getenv("CONN_HEALTH_CHECKS") != "0",
+            # PgBouncer in transaction mode can't keep a server-side cursor
+            # open across transactions, so .iterator() must fetch client-side
+            "DISABLE_SERVER_SIDE_CURSORS": os.getenv("POSTGRES_POOLER")
+            == "transaction",
         }
     }
 else:
@@ -177,6 +213,42 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New passwords are hashed with PASSWORD_HASHER. The other hashers only
+# check older hashes, which are rehashed with it on the next login.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER") or "scrypt"
+HASHERS = {
+    "scrypt": "user.hashers.ScryptPasswordHasher",
+    # needs argon2-cffi
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+if PASSWORD_HASHER not in HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(HASHERS)}, "
+        f"not {PASSWORD_HASHER!r}"
+    )
+PASSWORD_HASHERS = [
+    HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in HASHERS.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+# scrypt costs 128 * work_factor * block_size bytes of memory, 16 MiB here
+PASSWORD_SCRYPT = {
+    "work_factor": int(os.getenv("SCRYPT_WORK_FACTOR") or 2**14),
+    "block_size": int(os.getenv("SCRYPT_BLOCK_SIZE") or 8),
+    "parallelism": int(os.getenv("SCRYPT_PARALLELISM") or 1),
+}
+# memory_cost is in KiB
+PASSWORD_ARGON2 = {
+    "time_cost": int(os.getenv("ARGON2_TIME_COST") or 2),
+    "memory_cost": int(os.getenv("ARGON2_MEMORY_COST") or 19456),
+    "parallelism": int(os.getenv("ARGON2_PARALLELISM") or 1),
+}
+
+if PROFILE == "test":
+    # hashing passwords for thousands of test users needn't be slow
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
 AUTH_USER_MODEL = "user.User"
 
 # Internationalization
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings for serving the project in production, read by
+``gunicorn -c gunicorn.conf.py`` (and by plain ``gunicorn`` from this
+directory). Every setting can be overridden from the environment.
+
+GUNICORN_WORKER_CLASS=gthread (default) serves core.wsgi with a few
+threads per worker; GUNICORN_WORKER_CLASS=uvicorn serves core.asgi with
+uvicorn workers, which is what the async flight views are written for.
+"""
+
+import multiprocessing
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name) or default)
+
+
+cores = multiprocessing.cpu_count()
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or "gthread"
+
+if worker_class == "uvicorn":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    # one event loop per core serves many requests at once
+    workers = env_int("GUNICORN_WORKERS", cores)
+else:
+    wsgi_app = "core.wsgi:application"
+    # requests block on the database, so run more workers than cores
+    workers = env_int("GUNICORN_WORKERS", cores * 2 + 1)
+    threads = env_int("GUNICORN_THREADS", 4)
+
+bind = os.getenv("GUNICORN_BIND") or "0.0.0.0:8000"
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = timeout
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+# recycle workers now and then so a slow leak can't grow forever
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 10000)
+max_requests_jitter = max_requests // 10
+
+# heartbeat files on a tmpfs, a disk-backed /tmp can stall workers in docker
+worker_tmp_dir = os.getenv("GUNICORN_WORKER_TMP_DIR") or "/dev/shm"
+reload = os.getenv("GUNICORN_RELOAD") == "1"
+
+accesslog = "-"
+errorlog = "-"
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user"
+
+    def ready(self):
+        from django.contrib.auth import password_validation
+
+        from user import signals  # noqa: F401
+
+        # read CommonPasswordValidator's word list at startup, not on the
+        # first registration
+        password_validation.get_default_password_validators()
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+USER_CACHE_TIMEOUT = 60
+# what permissions and most views read; other fields load on first access
+SNAPSHOT_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id) -> str:
+    return f"jwt_user:{user_id}"
+
+
+def forget_user(user_id) -> None:
+    # drop the snapshot now and again once the change is visible to others,
+    # so a request racing the commit can't cache the old row for long
+    cache.delete(user_cache_key(user_id))
+    transaction.on_commit(lambda: cache.delete(user_cache_key(user_id)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds the user from a snapshot of SNAPSHOT_FIELDS
+    cached for USER_CACHE_TIMEOUT seconds instead of loading the row on
+    every request. Snapshots are forgotten when the user is saved or
+    deleted, see user.signals. Views that change the user should load it
+    from the database rather than save request.user.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = user_cache_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            user = super().get_user(validated_token)
+            snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+            if api_settings.CHECK_REVOKE_TOKEN:
+                snapshot["password_hash"] = get_md5_hash_password(user.password)
+            cache.set(key, snapshot, USER_CACHE_TIMEOUT)
+            return user
+
+        if not snapshot["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != snapshot.get("password_hash"):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return self.user_model.from_db(
+            "default", SNAPSHOT_FIELDS, [snapshot[field] for field in SNAPSHOT_FIELDS]
+        )
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    scrypt with the cost in settings.PASSWORD_SCRYPT. Hashes made with
+    other parameters are rehashed on the next login.
+    """
+
+    def __init__(self):
+        for name, value in settings.PASSWORD_SCRYPT.items():
+            setattr(self, name, value)
+        # scrypt takes 128 * n * r bytes, more than OpenSSL's default limit
+        # once the work factor goes past 2**14
+        self.maxmem = 2 * 128 * self.work_factor * self.block_size * self.parallelism
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id with the cost in settings.PASSWORD_ARGON2, needs argon2-cffi.
+    Hashes made with other parameters are rehashed on the next login.
+    """
+
+    def __init__(self):
+        for name, value in settings.PASSWORD_ARGON2.items():
+            setattr(self, name, value)
@@ -1,4 +1,5 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model, authenticate, password_validation
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from django.utils.translation import gettext as _
 
@@ -16,6 +17,19 @@ class UserSerializer(serializers.ModelSerializer):
             }
         }
 
+    def validate(self, attrs):
+        """Check a new password against AUTH_PASSWORD_VALIDATORS"""
+        password = attrs.get("password")
+        if password:
+            user = self.instance or get_user_model()(
+                **{name: value for name, value in attrs.items() if name != "password"}
+            )
+            try:
+                password_validation.validate_password(password, user)
+            except ValidationError as error:
+                raise serializers.ValidationError({"password": error.messages})
+        return attrs
+
     def create(self, validated_data):
         """Create a new user with encrypted password and return it"""
         return get_user_model().objects.create_user(**validated_data)
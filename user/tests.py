@@ -1,3 +1,139 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+
+AIRPORT_URL = reverse("airport:airport-list")
+# user.urls shares the "airport" namespace, so its names don't reverse
+ME_URL = "/api/user/me/"
+REGISTER_URL = "/api/user/register/"
+TOKEN_URL = "/api/user/token/"
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def user_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url, data)
+        return res, sum('"user_user"' in query["sql"] for query in queries)
+
+    def test_user_is_loaded_once(self):
+        first, first_queries = self.user_queries("get", AIRPORT_URL)
+        second, second_queries = self.user_queries("get", AIRPORT_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first_queries, 1)
+        self.assertEqual(second_queries, 0)
+
+    def test_saving_the_user_refreshes_permissions(self):
+        payload = {"name": "New Airport", "closest_big_city": "New City"}
+        self.assertEqual(
+            self.client.post(AIRPORT_URL, payload).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertEqual(
+            self.client.post(AIRPORT_URL, payload).status_code,
+            status.HTTP_201_CREATED,
+        )
+
+    def test_inactive_and_deleted_users_are_rejected(self):
+        self.client.get(AIRPORT_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        inactive = self.client.get(AIRPORT_URL)
+        self.user.delete()
+        deleted = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(inactive.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(deleted.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_is_seen_by_later_requests(self):
+        self.client.get(AIRPORT_URL)
+
+        res = self.client.patch(ME_URL, {"email": "new@myproject.com"})
+        me = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(me.data["email"], "new@myproject.com")
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        "user.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ],
+    PASSWORD_SCRYPT={"work_factor": 2**10, "block_size": 8, "parallelism": 1},
+)
+class PasswordTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def obtain_token(self, email, password):
+        return self.client.post(TOKEN_URL, {"email": email, "password": password})
+
+    def test_register_hashes_with_scrypt(self):
+        res = self.client.post(
+            REGISTER_URL, {"email": "new@myproject.com", "password": "Heron-Runway-42"}
+        )
+
+        user = get_user_model().objects.get(email="new@myproject.com")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(user.password.startswith("scrypt$1024$"))
+        self.assertTrue(user.check_password("Heron-Runway-42"))
+
+    def test_register_runs_password_validators(self):
+        for password in ("password123", "83749201", "new@myproject.com"):
+            with self.subTest(password):
+                res = self.client.post(
+                    REGISTER_URL, {"email": "new@myproject.com", "password": password}
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("password", res.data)
+
+    def test_login_rehashes_older_hashes(self):
+        user = get_user_model().objects.create_user("user@myproject.com")
+        with override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+        ):
+            user.set_password("Heron-Runway-42")
+        user.save()
+
+        res = self.obtain_token(user.email, "Heron-Runway-42")
+        user.refresh_from_db()
+        rehashed = user.password
+
+        # hashers are cached until PASSWORD_HASHERS changes
+        with override_settings(
+            PASSWORD_HASHERS=[*settings.PASSWORD_HASHERS],
+            PASSWORD_SCRYPT={"work_factor": 2**11, "block_size": 8, "parallelism": 1},
+        ):
+            self.obtain_token(user.email, "Heron-Runway-42")
+        user.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(rehashed.startswith("scrypt$1024$"))
+        self.assertTrue(user.password.startswith("scrypt$2048$"))